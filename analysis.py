@@ -1,61 +1,910 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import base64
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
 import sys
+import time
 import logging
 from datetime import datetime
+from latency_histogram import LatencyHistogram, REPORTED_PERCENTILES
+from binary_report import is_binary_report, open_binary_report, read_binary_header
+from report_writer import REPORT_FIELDS, health_report_path
 
 logging.basicConfig(level=logging.INFO)
 
-def analyze_report(csv_file):
-    try:
-        # Read file lines to check for headers
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        if not lines:
+CONFIG_HEADER = "### Test Configuration ###"
+METRICS_HEADER = "### Performance Metrics ###"
+# Explicit dtypes keep chunk parsing cheap and the low-cardinality columns compact
+METRIC_DTYPES = {
+    "timestamp": "object",
+    "operation": "category",
+    "response_time": "float64",
+    "status": "category",
+    "response_length": "float64",
+    "intended_start": "object",
+    "connect_time": "float64",
+    "tls_time": "float64",
+    "ttfb": "float64",
+    "body_time": "float64",
+    "connection_reused": "float64",
+}
+# Request phases recorded with PHASE_TIMING, in the order they happen
+PHASE_COLUMNS = ["connect_time", "tls_time", "ttfb", "body_time"]
+# Uploads whose response_length is the bytes pushed, so bytes / response time is their transfer rate
+TRANSFER_OPERATIONS = ("push_image", "push_layer", "push_blob_upload")
+DEFAULT_CHUNK_MB = 64
+DEFAULT_BUCKET_SECONDS = 10
+SERIES_PERCENTILES = (50, 95, 99)
+SERIES_COLUMNS = ["bucket_start", "operation", "requests", "rps", "errors", "error_rate"] + [f"p{p}" for p in SERIES_PERCENTILES]
+# Same defaults as HEALTH_CPU_WARN_PERCENT / HEALTH_LAG_WARN_MS in config.py
+DEFAULT_CPU_WARN_PERCENT = 90
+DEFAULT_LAG_WARN_MS = 50
+# Analysis state cached next to each report (<report>.analysis-cache) as JSON, never
+# pickle, since reports and their caches get passed around; bump the version whenever
+# the cached structures change
+CACHE_SUFFIX = ".analysis-cache"
+CACHE_VERSION = 6
+HASH_BLOCK = 1024 * 1024
+DEFAULT_REFRESH_SECONDS = 5
+DEFAULT_WINDOW_SECONDS = 60
+# A rolling window is kept as this many fixed time slots
+WINDOW_SLOTS = 12
+# Same defaults as STEP_DURATION in config.py; the start of every step is skipped
+# so the ramp to the new user count doesn't count against it
+DEFAULT_STEP_SECONDS = 120
+DEFAULT_STEP_COUNT = 10
+DEFAULT_STEP_WARMUP_SECONDS = 10
+# Operations driven by the users, the only ones capacity is measured on: deletes (pool
+# evictions, teardown) and the scan poller's background traffic don't follow the user
+# count. The resource pool's provisioning shares the create_* names but runs at test
+# start, inside the first step's warm-up.
+CAPACITY_OPERATIONS = ("create_repository", "push_image", "create_policy", "create_watch", "check_scan_status",
+                       "get_violations")
+DEFAULT_SLO_P99_MS = 1000
+DEFAULT_SLO_ERROR_RATE = 1.0
+STEP_COLUMNS = ["step", "operation", "requests", "rps", "errors", "error_rate", "p50", "p99"]
+COMPARE_PERCENTILES = (50, 95, 99)
+# Samples kept per operation and report for bootstrapping (a uniform random subset beyond that)
+COMPARE_MAX_SAMPLES = 20000
+DEFAULT_BOOTSTRAP_ITERATIONS = 1000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_REGRESSION_PERCENT = 5.0
+# Below this many samples on either side a bootstrap interval means nothing: deltas are
+# reported but never flagged as regressions
+DEFAULT_MIN_SAMPLES = 30
+COMPARE_COLUMNS = ["candidate", "operation", "percentile", "baseline_ms", "candidate_ms", "delta_ms", "delta_percent",
+                   "ci_low_ms", "ci_high_ms", "baseline_samples", "candidate_samples", "regression"]
+
+def default_config():
+    return {
+        "jfrog_url": "https://trialvq0712.jfrog.io",
+        "username": "unknown",
+        "num_users": "unknown",
+        "spawn_rate": "unknown",
+        "test_start_time": "2025-06-22T05:16:48",
+        "test_duration": "11 seconds (estimated)",
+        "repo_name_pattern": "docker-local-<timestamp>-<uuid>",
+        "image_name": "alpine:3.9",
+        "custom_tag": "test"
+    }
+
+def scan_report_header(csv_file):
+    """Read only the leading sections of a report
+
+    Returns the parsed configuration, the metric column names and the byte offset
+    where metric rows start, without touching the (potentially huge) metrics body.
+    """
+    config = default_config()
+    with open(csv_file, 'rb') as f:
+        line = f.readline()
+        if not line:
             logging.error(f"CSV file {csv_file} is empty")
             raise ValueError("Empty CSV file")
-        
-        # Check for configuration and metrics headers
-        config = {
-            "jfrog_url": "https://trialvq0712.jfrog.io",
-            "username": "unknown",
-            "num_users": "unknown",
-            "spawn_rate": "unknown",
-            "test_start_time": "2025-06-22T05:16:48",
-            "test_duration": "11 seconds (estimated)",
-            "repo_name_pattern": "docker-local-<timestamp>-<uuid>",
-            "image_name": "alpine:3.9",
-            "custom_tag": "test"
+        text = line.decode('utf-8').strip()
+        if text == CONFIG_HEADER:
+            for line in iter(f.readline, b''):
+                text = line.decode('utf-8').strip()
+                if text == METRICS_HEADER:
+                    break
+                if text and ',' in text:
+                    key, value = text.split(',', 1)
+                    config[key] = value
+            logging.info(f"Parsed configuration: {config}")
+        if text == METRICS_HEADER:
+            logging.info(f"Found '{METRICS_HEADER}' header")
+            line = f.readline()
+        elif text != CONFIG_HEADER:
+            logging.warning(f"No '{METRICS_HEADER}' header found, reading entire file as metrics")
+        columns = line.decode('utf-8').strip().split(',')
+        if columns == ['']:
+            logging.error("No metrics data found in CSV")
+            raise ValueError("No metrics data")
+        return config, columns, f.tell()
+
+def iter_metric_chunks(csv_file, columns, start, end=None, chunk_bytes=DEFAULT_CHUNK_MB * 1024 * 1024,
+                       hold_partial=False):
+    """Yield (DataFrame, end_offset) for the metric rows between two byte offsets
+
+    Blocks are cut on line boundaries, so end_offset always points just past the
+    last row parsed and can be used to resume reading later. A final row without a
+    trailing newline is parsed too, unless `hold_partial` is set because a live run
+    may still be writing it.
+    """
+    import pandas as pd
+
+    dtypes = {name: dtype for name, dtype in METRIC_DTYPES.items() if name in columns}
+    with open(csv_file, 'rb') as f:
+        f.seek(start)
+        position = start
+        remainder = b''
+        while end is None or position < end:
+            data = f.read(chunk_bytes if end is None else min(chunk_bytes, end - position))
+            if not data:
+                break
+            position += len(data)
+            data = remainder + data
+            cut = data.rfind(b'\n') + 1
+            remainder = data[cut:]
+            if cut:
+                yield pd.read_csv(io.BytesIO(data[:cut]), names=columns, header=None, dtype=dtypes), position - len(remainder)
+        if remainder.strip() and not hold_partial:
+            # Final row without a trailing newline
+            yield pd.read_csv(io.BytesIO(remainder), names=columns, header=None, dtype=dtypes), position
+
+def local_timezone():
+    return datetime.now().astimezone().tzinfo
+
+def binary_records_to_frame(header, records):
+    """Build a report DataFrame from memory-mapped records without any text parsing"""
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime(records['timestamp_ns'], unit='ns', utc=True)
+            .tz_convert(local_timezone()).tz_localize(None),
+        "operation": pd.Categorical.from_codes(records['operation'], categories=header['operations']),
+        "response_time": records['response_time'],
+        "status": pd.Categorical.from_codes(records['status'], categories=header['statuses']),
+    })
+    if 'response_length' in records.dtype.names:
+        frame['response_length'] = records['response_length']
+    if 'intended_start_ns' in records.dtype.names:
+        intended = pd.Series(records['intended_start_ns'])
+        frame['intended_start'] = pd.to_datetime(intended, unit='ns', utc=True) \
+            .dt.tz_convert(local_timezone()).dt.tz_localize(None).where(intended != 0)
+    for column in PHASE_COLUMNS:
+        if column in records.dtype.names:
+            frame[column] = records[column].astype('float64')
+    if 'connection_reused' in records.dtype.names:
+        reused = pd.Series(records['connection_reused'].astype('float64'))
+        frame['connection_reused'] = reused.where(reused >= 0)
+    return frame
+
+def corrected_response_times(df):
+    """Latency measured from each request's intended start (coordinated-omission corrected)
+
+    A request that started late because its user fell behind schedule is charged
+    for the delay. Rows without an intended start (older reports) keep their raw
+    response time, as do rows without a response time.
+    """
+    import pandas as pd
+
+    raw = df['response_time']
+    if 'intended_start' not in df.columns:
+        return raw
+    intended = pd.to_datetime(df['intended_start'], format='ISO8601', errors='coerce')
+    completed = pd.to_datetime(df['timestamp'], format='ISO8601')
+    corrected = (completed - intended).dt.total_seconds() * 1000
+    return corrected.where(intended.notna(), raw).clip(lower=raw).where(raw.notna())
+
+def load_binary_report(path):
+    header, records = open_binary_report(path)
+    return binary_records_to_frame(header, records)
+
+def load_report(path):
+    """(config, DataFrame) of a whole CSV or binary report, with numeric response times"""
+    import pandas as pd
+
+    if is_binary_report(path):
+        config = default_config()
+        df = load_binary_report(path)
+    else:
+        config, columns, start = scan_report_header(path)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            df = pd.read_csv(f, names=columns, header=None)
+    if df.empty:
+        logging.error("No metrics data found in CSV")
+        raise ValueError("No metrics data")
+    df['response_time'] = pd.to_numeric(df['response_time'], errors='coerce')
+    return config, df
+
+def iter_report_positions(path, chunk_mb=DEFAULT_CHUNK_MB, start=None, end=None, hold_partial=False):
+    """Yield (config, DataFrame, position) chunks from a CSV or binary report with bounded memory
+
+    `position` is where reading can resume later (a byte offset in a CSV report, a
+    record index in a binary one); `start` resumes from such a position and `end`
+    stops at a file size, ignoring anything appended after it. `hold_partial` leaves
+    a last CSV row without a newline for the next read (see iter_metric_chunks).
+    """
+    if is_binary_report(path):
+        header, records = open_binary_report(path)
+        if end is not None:
+            _, offset = read_binary_header(path)
+            records = records[:max(0, (end - offset) // records.dtype.itemsize)]
+        rows_per_chunk = max(1, chunk_mb * 1024 * 1024 // records.dtype.itemsize)
+        for i in range(start or 0, len(records), rows_per_chunk):
+            chunk = records[i:i + rows_per_chunk]
+            yield default_config(), binary_records_to_frame(header, chunk), i + len(chunk)
+        return
+    config, columns, header_end = scan_report_header(path)
+    for chunk, position in iter_metric_chunks(path, columns, start or header_end, end, chunk_mb * 1024 * 1024,
+                                              hold_partial):
+        yield config, chunk, position
+
+def iter_report_chunks(path, chunk_mb=DEFAULT_CHUNK_MB):
+    """Yield (config, DataFrame) chunks from a CSV or binary report with bounded memory"""
+    for config, chunk, _ in iter_report_positions(path, chunk_mb):
+        yield config, chunk
+
+def export_csv(binary_path, csv_path, chunk_mb=DEFAULT_CHUNK_MB):
+    """Convert a binary report to the CSV report format, chunk by chunk"""
+    first = True
+    for _, chunk in iter_report_chunks(binary_path, chunk_mb):
+        chunk['timestamp'] = chunk['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        if 'intended_start' in chunk.columns:
+            chunk['intended_start'] = chunk['intended_start'].dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        if 'connection_reused' in chunk.columns:
+            chunk['connection_reused'] = chunk['connection_reused'].astype('Int64')
+        chunk.to_csv(csv_path, mode='w' if first else 'a', header=first, index=False,
+                     columns=[c for c in REPORT_FIELDS if c in chunk.columns])
+        first = False
+    logging.info(f"Exported {binary_path} to {csv_path}")
+
+def ends_on_row_boundary(path, position):
+    """Whether a resume position follows a complete row (always true for binary record indices)"""
+    if position is None or is_binary_report(path):
+        return True
+    with open(path, 'rb') as f:
+        f.seek(position - 1)
+        return f.read(1) == b'\n'
+
+def report_fingerprint(path, prefix_size=None):
+    """(size, digest) of a report, plus the digest of its first `prefix_size` bytes, in one pass"""
+    digest = hashlib.blake2b(digest_size=16)
+    prefix_digest = None
+    with open(path, 'rb') as f:
+        if prefix_size is not None:
+            remaining = prefix_size
+            while remaining:
+                data = f.read(min(HASH_BLOCK, remaining))
+                if not data:
+                    break
+                digest.update(data)
+                remaining -= len(data)
+            if not remaining:
+                prefix_digest = digest.hexdigest()
+        for data in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(data)
+        size = f.tell()
+    return size, digest.hexdigest(), prefix_digest
+
+def load_analysis_cache(report_path, bucket_seconds):
+    """Cached analysis of a report and how the report changed since it was cached
+
+    Returns (cache, status, size, digest) where status is "unchanged", "grown" (the
+    cached bytes are intact and rows were appended, e.g. by a live run) or None when
+    there is no usable cache. size / digest describe the report as it is now.
+    """
+    cache = None
+    try:
+        with open(report_path + CACHE_SUFFIX) as f:
+            cache = json.load(f)
+        if cache.get("version") != CACHE_VERSION or cache.get("bucket_seconds") != bucket_seconds:
+            cache = None
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable analysis cache for {report_path}: {str(e)}")
+        cache = None
+    size, digest, prefix_digest = report_fingerprint(report_path, cache["size"] if cache else None)
+    if cache is None or prefix_digest != cache["digest"]:
+        return {}, None, size, digest
+    return cache, "unchanged" if size == cache["size"] else "grown", size, digest
+
+def save_analysis_cache(report_path, bucket_seconds, size, digest, cache, **entries):
+    """Store analysis entries for the report as of (size, digest), keeping entries still valid for it"""
+    if cache.get("size") != size or cache.get("digest") != digest:
+        cache = {}
+    cache = {**cache, **entries, "version": CACHE_VERSION, "bucket_seconds": bucket_seconds,
+             "size": size, "digest": digest}
+    try:
+        with open(report_path + CACHE_SUFFIX, 'w') as f:
+            json.dump(cache, f, default=lambda value: value.item())  # numpy scalars
+    except OSError as e:
+        logging.warning(f"Could not write the analysis cache for {report_path}: {str(e)}")
+
+def histogram_to_state(histogram):
+    """JSON-safe LatencyHistogram snapshot, with the counter arrays base64-encoded"""
+    snapshot = histogram.to_snapshot()
+    return {**snapshot, "indices": base64.b64encode(snapshot["indices"]).decode('ascii'),
+            "counts": base64.b64encode(snapshot["counts"]).decode('ascii')}
+
+def histogram_from_state(state):
+    return LatencyHistogram.from_snapshot({**state, "indices": base64.b64decode(state["indices"]),
+                                           "counts": base64.b64decode(state["counts"])})
+
+def full_analysis_to_state(metrics, series):
+    """JSON-safe default-mode results: the metrics plus the bucket series as CSV text"""
+    return {"metrics": metrics, "series": series.to_csv(index=False)}
+
+def full_analysis_from_state(state):
+    import pandas as pd
+
+    metrics = dict(state["metrics"])
+    # JSON object keys are strings: restore the numeric percentile keys
+    for key in ('percentiles', 'corrected_percentiles'):
+        metrics[key] = {op: {float(p): value for p, value in values.items()} for op, values in metrics[key].items()}
+    series = pd.read_csv(io.StringIO(state["series"]), parse_dates=['bucket_start'], float_precision='round_trip')
+    return metrics, series
+
+def phase_sums(df):
+    """Per-operation sums behind the phase breakdown, mergeable across chunks
+
+    Only rows with phase timing count. Response times are also split by whether the
+    connection was new or reused, which shows what connection setup costs.
+    """
+    if 'connection_reused' not in df.columns:
+        return {}
+    timed = df[df['connection_reused'].notna()]
+    sums = {}
+    for op, rows in timed.groupby('operation', observed=True):
+        reused = rows['connection_reused'] == 1
+        sums[op] = {
+            "requests": len(rows),
+            "reused": int(reused.sum()),
+            **{column: float(rows[column].sum()) for column in PHASE_COLUMNS},
+            "new_response_time": float(rows.loc[~reused, 'response_time'].sum()),
+            "reused_response_time": float(rows.loc[reused, 'response_time'].sum()),
         }
-        metrics_start = 0
-        if "### Performance Metrics ###\n" in lines:
-            metrics_start = lines.index("### Performance Metrics ###\n") + 2
-            logging.info("Found '### Performance Metrics ###' header")
-            if "### Test Configuration ###\n" in lines:
-                config_end = lines.index("### Performance Metrics ###\n")
-                config_lines = lines[lines.index("### Test Configuration ###\n") + 1:config_end]
-                for line in config_lines:
-                    if line.strip() and ',' in line:
-                        key, value = line.strip().split(',', 1)
-                        config[key] = value
-                logging.info(f"Parsed configuration: {config}")
-        else:
-            logging.warning("No '### Performance Metrics ###' header found, reading entire file as metrics")
-        
-        # Read metrics
-        df = pd.read_csv(csv_file, skiprows=metrics_start)
+    return sums
+
+def merge_phase_sums(total, sums):
+    for op, values in sums.items():
+        acc = total.setdefault(op, dict.fromkeys(values, 0))
+        for key, value in values.items():
+            acc[key] += value
+    return total
+
+def phase_breakdown(sums):
+    """Mean ms per phase, connection reuse rate and mean response time of new vs reused connections
+
+    `other` is the part of the response time no phase covers: client-side overhead
+    such as building the request and processing the response.
+    """
+    breakdown = {}
+    for op, acc in sorted(sums.items()):
+        new = acc["requests"] - acc["reused"]
+        means = {column: acc[column] / acc["requests"] for column in PHASE_COLUMNS}
+        response_time = (acc["new_response_time"] + acc["reused_response_time"]) / acc["requests"]
+        breakdown[op] = {
+            "requests": acc["requests"],
+            **means,
+            "other": max(0.0, response_time - sum(means.values())),
+            "reuse_rate": acc["reused"] / acc["requests"] * 100,
+            "new_connection_response_time": acc["new_response_time"] / new if new else float('nan'),
+            "reused_connection_response_time": acc["reused_response_time"] / acc["reused"] if acc["reused"] else float('nan'),
+        }
+    return breakdown
+
+def transfer_sums(df):
+    """Bytes and ms of the successful TRANSFER_OPERATIONS rows per operation, mergeable across chunks
+
+    Rows without bytes (layers the registry already had) are left out.
+    """
+    if 'response_length' not in df.columns:
+        return {}
+    rows = df[df['operation'].isin(TRANSFER_OPERATIONS) & (df['status'] == 'success')
+              & (df['response_length'] > 0) & (df['response_time'] > 0)]
+    return {op: {"requests": len(group), "bytes": float(group['response_length'].sum()),
+                 "response_time": float(group['response_time'].sum())}
+            for op, group in rows.groupby('operation', observed=True)}
+
+def transfer_rates(sums):
+    """MB/s (MiB, as the push log reports) per operation: total bytes over total transfer time"""
+    return {op: {"requests": acc["requests"], "mb": acc["bytes"] / (1024 * 1024),
+                 "mb_per_second": acc["bytes"] / (1024 * 1024) / (acc["response_time"] / 1000)}
+            for op, acc in sorted(sums.items())}
+
+class ReportAccumulator:
+    """Bounded-memory per-operation statistics accumulated chunk by chunk
+
+    Besides whole-run totals, every (time bucket, operation) pair keeps its request
+    and error counts plus a coarse latency histogram, so memory grows with run
+    length / bucket size rather than with the number of rows.
+    """
+
+    def __init__(self, bucket_seconds=DEFAULT_BUCKET_SECONDS, series=True):
+        self.total_requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.operations = {}
+        self.bucket_seconds = bucket_seconds
+        self.series = series  # without the series, memory no longer grows with run length
+        self.buckets = {}
+        self.phases = {}
+        self.transfers = {}
+
+    def to_state(self):
+        """JSON-safe state for the analysis cache"""
+        return {
+            "total_requests": self.total_requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "bucket_seconds": self.bucket_seconds,
+            "series": self.series,
+            "operations": {op: {**acc, "histogram": histogram_to_state(acc["histogram"]),
+                                "corrected_histogram": histogram_to_state(acc["corrected_histogram"])}
+                           for op, acc in self.operations.items()},
+            "buckets": [[int(bucket), op, {**acc, "histogram": histogram_to_state(acc["histogram"])}]
+                        for (bucket, op), acc in self.buckets.items()],
+            "phases": self.phases,
+            "transfers": self.transfers,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        accumulator = cls(state["bucket_seconds"], state["series"])
+        accumulator.total_requests = state["total_requests"]
+        accumulator.successes = state["successes"]
+        accumulator.failures = state["failures"]
+        accumulator.operations = {
+            op: {**acc, "histogram": histogram_from_state(acc["histogram"]),
+                 "corrected_histogram": histogram_from_state(acc["corrected_histogram"])}
+            for op, acc in state["operations"].items()
+        }
+        accumulator.buckets = {(bucket, op): {**acc, "histogram": histogram_from_state(acc["histogram"])}
+                               for bucket, op, acc in state["buckets"]}
+        accumulator.phases = state["phases"]
+        accumulator.transfers = state["transfers"]
+        return accumulator
+
+    def _operation(self, op):
+        if op not in self.operations:
+            self.operations[op] = {
+                "count": 0,
+                "sum": 0.0,
+                "timed": 0,
+                "max": float('nan'),
+                "failures": 0,
+                "histogram": LatencyHistogram(),
+                "corrected_histogram": LatencyHistogram(),
+            }
+        return self.operations[op]
+
+    def update(self, df):
+        import pandas as pd
         if df.empty:
+            return
+        self.total_requests += len(df)
+        self.successes += int((df['status'] == 'success').sum())
+        self.failures += int((df['status'] == 'failed').sum())
+        grouped = df.groupby('operation', observed=True)
+        stats = grouped['response_time'].agg(['size', 'sum', 'count', 'max'])
+        failures = df[df['status'] == 'failed']['operation'].value_counts()
+        for op, row in stats.iterrows():
+            acc = self._operation(op)
+            acc["count"] += int(row['size'])
+            acc["sum"] += float(row['sum'])
+            acc["timed"] += int(row['count'])
+            if row['count']:
+                acc["max"] = row['max'] if pd.isna(acc["max"]) else max(acc["max"], row['max'])
+            acc["failures"] += int(failures.get(op, 0))
+        for op, response_times in grouped['response_time']:
+            self._operation(op)["histogram"].record_values(response_times.to_numpy())
+        for op, response_times in corrected_response_times(df).groupby(df['operation'], observed=True):
+            self._operation(op)["corrected_histogram"].record_values(response_times.to_numpy())
+        merge_phase_sums(self.phases, phase_sums(df))
+        merge_phase_sums(self.transfers, transfer_sums(df))
+        if self.series:
+            self._update_buckets(df)
+
+    def _update_buckets(self, df):
+        import pandas as pd
+        timestamps = pd.to_datetime(df['timestamp'], format='ISO8601')
+        bucket_ns = self.bucket_seconds * 1_000_000_000
+        keys = pd.DataFrame({
+            "bucket": timestamps.to_numpy().astype('datetime64[ns]').astype('int64') // bucket_ns * bucket_ns,
+            "operation": df['operation'],
+            "failed": df['status'] == 'failed',
+            "response_time": df['response_time'],
+        })
+        for (bucket, op), group in keys.groupby(['bucket', 'operation'], observed=True):
+            acc = self.buckets.get((bucket, op))
+            if acc is None:
+                acc = self.buckets[(bucket, op)] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "histogram": LatencyHistogram(significant_figures=1),
+                }
+            acc["requests"] += len(group)
+            acc["errors"] += int(group['failed'].sum())
+            acc["histogram"].record_values(group['response_time'].to_numpy())
+
+    def bucket_series(self):
+        """Per-bucket, per-operation throughput, error rate and latency percentiles"""
+        import pandas as pd
+
+        rows = []
+        for (bucket, op), acc in sorted(self.buckets.items()):
+            histogram = acc["histogram"]
+            rows.append([pd.Timestamp(bucket), op, acc["requests"], acc["requests"] / self.bucket_seconds,
+                         acc["errors"], acc["errors"] / acc["requests"] * 100]
+                        + [histogram.percentile(p) for p in SERIES_PERCENTILES])
+        return pd.DataFrame(rows, columns=SERIES_COLUMNS)
+
+    def metrics(self, config):
+        ops = self.operations
+        return {
+            "total_requests": self.total_requests,
+            "operations": list(ops),
+            "success_rate": self.successes / self.total_requests * 100 if self.total_requests else 0.0,
+            "failure_rate": self.failures / self.total_requests * 100 if self.total_requests else 0.0,
+            "avg_response_time": {op: acc["sum"] / acc["timed"] if acc["timed"] else float('nan') for op, acc in ops.items()},
+            "max_response_time": {op: acc["max"] for op, acc in ops.items()},
+            "percentiles": {op: acc["histogram"].percentiles() for op, acc in ops.items()},
+            "corrected_percentiles": {op: acc["corrected_histogram"].percentiles() for op, acc in ops.items()},
+            "phases": phase_breakdown(self.phases),
+            "transfer_rates": transfer_rates(self.transfers),
+            "failure_counts": {op: acc["failures"] for op, acc in ops.items() if acc["failures"]},
+            "config": config
+        }
+
+def load_generator_health(report_path):
+    """Generator health sidecar written next to the report, or None if the run has none"""
+    import pandas as pd
+
+    path = health_report_path(os.path.splitext(report_path)[0])
+    # A report not named performance_report_* maps onto itself and has no sidecar
+    if os.path.abspath(path) == os.path.abspath(report_path) or not os.path.exists(path):
+        return None
+    health = pd.read_csv(path)
+    if health.empty:
+        return None
+    health['timestamp'] = pd.to_datetime(health['timestamp'], format='ISO8601')
+    health['worker_id'] = health['worker_id'].astype(str)
+    return health.sort_values('timestamp').reset_index(drop=True)
+
+def saturation_windows(health, cpu_warn_percent=DEFAULT_CPU_WARN_PERCENT, lag_warn_ms=DEFAULT_LAG_WARN_MS):
+    """Consecutive saturated samples per worker, merged into (start, end) windows
+
+    A sample's timestamp marks the end of its interval, so each window starts one
+    sample interval before its first saturated sample.
+    """
+    import pandas as pd
+
+    saturated = (health['cpu_percent'] >= cpu_warn_percent) | (health['loop_lag_ms'] >= lag_warn_ms)
+    windows = []
+    for worker_id, samples in health.assign(saturated=saturated).groupby('worker_id'):
+        interval = samples['timestamp'].diff().median()
+        interval = pd.Timedelta(0) if pd.isna(interval) else interval
+        runs = (samples['saturated'] != samples['saturated'].shift()).cumsum()
+        for _, window in samples[samples['saturated']].groupby(runs[samples['saturated']]):
+            windows.append({
+                "worker_id": worker_id,
+                "start": window['timestamp'].iloc[0] - interval,
+                "end": window['timestamp'].iloc[-1],
+                "samples": len(window),
+                "max_cpu_percent": window['cpu_percent'].max(),
+                "max_loop_lag_ms": window['loop_lag_ms'].max(),
+            })
+    return sorted(windows, key=lambda window: window['start'])
+
+def analyze_generator_health(report_path, cpu_warn_percent=DEFAULT_CPU_WARN_PERCENT, lag_warn_ms=DEFAULT_LAG_WARN_MS):
+    """Load the health sidecar and warn about every window where the load generator was saturated
+
+    Returns (health, metrics), both None when the run has no health sidecar.
+    """
+    health = load_generator_health(report_path)
+    if health is None:
+        logging.info("No generator health data found; cannot tell server latency from a saturated generator")
+        return None, None
+    windows = saturation_windows(health, cpu_warn_percent, lag_warn_ms)
+    for window in windows:
+        logging.warning(
+            f"Generator saturated on worker {window['worker_id']} from {window['start']:%H:%M:%S} to "
+            f"{window['end']:%H:%M:%S} (CPU up to {window['max_cpu_percent']:.0f}%, loop lag up to "
+            f"{window['max_loop_lag_ms']:.1f} ms): latencies in this window include client-side delay"
+        )
+    return health, {
+        "workers": health['worker_id'].nunique(),
+        "max_cpu_percent": health['cpu_percent'].max(),
+        "max_loop_lag_ms": health['loop_lag_max_ms'].max(),
+        "max_rss_mb": health['rss_mb'].max(),
+        "max_open_sockets": health['open_sockets'].max(),
+        "saturated_windows": windows,
+    }
+
+class RollingWindow:
+    """Per-operation requests, errors and latency over the last `window_seconds` of report time
+
+    Rows are counted into WINDOW_SLOTS fixed time slots and slots that fall out of the
+    window are dropped, so memory depends on the window and not on the run length.
+    """
+
+    def __init__(self, window_seconds=DEFAULT_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.slot_ns = int(window_seconds * 1_000_000_000 / WINDOW_SLOTS)
+        self.slots = {}  # slot index -> {operation: [requests, errors, histogram]}
+        self.newest_ns = None
+
+    def update(self, df):
+        import pandas as pd
+
+        if df.empty:
+            return
+        timestamps_ns = pd.to_datetime(df['timestamp'], format='ISO8601').to_numpy() \
+            .astype('datetime64[ns]').astype('int64')
+        keys = pd.DataFrame({
+            "slot": timestamps_ns // self.slot_ns,
+            "operation": df['operation'],
+            "failed": df['status'] == 'failed',
+            "response_time": pd.to_numeric(df['response_time'], errors='coerce'),
+        })
+        for (slot, op), group in keys.groupby(['slot', 'operation'], observed=True):
+            operations = self.slots.setdefault(int(slot), {})
+            acc = operations.get(op)
+            if acc is None:
+                acc = operations[op] = [0, 0, LatencyHistogram(significant_figures=1)]
+            acc[0] += len(group)
+            acc[1] += int(group['failed'].sum())
+            acc[2].record_values(group['response_time'].to_numpy())
+        newest = int(timestamps_ns.max())
+        self.newest_ns = newest if self.newest_ns is None else max(self.newest_ns, newest)
+        oldest_slot = self.newest_ns // self.slot_ns - WINDOW_SLOTS + 1
+        for slot in [slot for slot in self.slots if slot < oldest_slot]:
+            del self.slots[slot]
+
+    def operations(self):
+        """{operation: (rps, error rate %, histogram)} over the rows currently in the window"""
+        if not self.slots:
+            return {}
+        # From the start of the oldest slot to the newest row, so a filling slot doesn't dilute the rates
+        span = max((self.newest_ns - min(self.slots) * self.slot_ns) / 1e9, 1.0)
+        merged = {}
+        for operations in self.slots.values():
+            for op, (requests, errors, histogram) in operations.items():
+                acc = merged.get(op)
+                if acc is None:
+                    acc = merged[op] = [0, 0, LatencyHistogram(significant_figures=1)]
+                acc[0] += requests
+                acc[1] += errors
+                acc[2].merge(histogram)
+        return {op: (requests / span, errors / requests * 100, histogram)
+                for op, (requests, errors, histogram) in sorted(merged.items())}
+
+def compute_bucket_series(df, bucket_seconds=DEFAULT_BUCKET_SECONDS):
+    """Vectorised per-operation series resampled into fixed N-second buckets"""
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime(df['timestamp'], format='ISO8601'),
+        "operation": df['operation'],
+        "failed": df['status'] == 'failed',
+        "response_time": df['response_time'],
+    }).set_index('timestamp')
+    grouped = frame.groupby(['operation', pd.Grouper(freq=f'{bucket_seconds}s')], observed=True)
+    series = grouped.agg(requests=('failed', 'size'), errors=('failed', 'sum'))
+    series = series[series['requests'] > 0]
+    quantiles = grouped['response_time'].quantile([p / 100 for p in SERIES_PERCENTILES]).unstack()
+    quantiles.columns = [f"p{p}" for p in SERIES_PERCENTILES]
+    series = series.join(quantiles)
+    series['rps'] = series['requests'] / bucket_seconds
+    series['error_rate'] = series['errors'] / series['requests'] * 100
+    series = series.reset_index().rename(columns={"timestamp": "bucket_start"})
+    return series.sort_values(['bucket_start', 'operation'])[SERIES_COLUMNS].reset_index(drop=True)
+
+def write_bucket_series(series, csv_path='timeseries.csv', json_path='timeseries.json'):
+    """Persist the bucket series so throughput curves can be diffed between runs"""
+    series.to_csv(csv_path, index=False, date_format='%Y-%m-%dT%H:%M:%S')
+    series.to_json(json_path, orient='records', date_format='iso')
+
+def plot_bucket_series(series, bucket_seconds, path='response_time.png', health=None, generator_health=None):
+    """Latency percentiles, throughput and error rate per operation over time
+
+    With generator health samples, a fourth panel shows each worker's CPU % and loop
+    lag, and windows where a worker was saturated are shaded on every panel.
+    """
+    import matplotlib.pyplot as plt
+
+    if health is None:
+        fig, (ax_latency, ax_rps, ax_errors) = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+    else:
+        fig, (ax_latency, ax_rps, ax_errors, ax_health) = plt.subplots(4, 1, figsize=(12, 13), sharex=True)
+        ax_lag = ax_health.twinx()
+        for worker_id, samples in health.groupby('worker_id'):
+            ax_health.plot(samples['timestamp'], samples['cpu_percent'], label=f"worker {worker_id} CPU")
+            ax_lag.plot(samples['timestamp'], samples['loop_lag_ms'], linestyle='--', label=f"worker {worker_id} loop lag")
+        ax_health.set_ylabel('Generator CPU (%)')
+        ax_lag.set_ylabel('Loop Lag (ms)')
+        ax_health.legend(loc='upper left')
+        ax_lag.legend(loc='upper right')
+        for i, window in enumerate(generator_health["saturated_windows"]):
+            for ax in (ax_latency, ax_rps, ax_errors, ax_health):
+                ax.axvspan(window['start'], window['end'], color='red', alpha=0.15,
+                           label='generator saturated' if i == 0 and ax is ax_latency else None)
+    for op, op_series in series.groupby('operation', observed=True):
+        ax_latency.plot(op_series['bucket_start'], op_series['p95'], label=f"{op} p95")
+        ax_rps.plot(op_series['bucket_start'], op_series['rps'], label=op)
+        ax_errors.plot(op_series['bucket_start'], op_series['error_rate'], label=op)
+    ax_latency.set_ylabel('Response Time p95 (ms)')
+    ax_latency.set_title(f'Response Time Over Time by Operation ({bucket_seconds}s buckets)')
+    ax_latency.legend()
+    ax_rps.set_ylabel('Requests/sec')
+    ax_errors.set_ylabel('Error Rate (%)')
+    (ax_errors if health is None else ax_health).set_xlabel('Time')
+    plt.xticks(rotation=45)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+def use_plot_style():
+    import matplotlib.pyplot as plt
+    available_styles = plt.style.available
+    plot_style = 'ggplot' if 'ggplot' in available_styles else 'default'
+    logging.info(f"Using matplotlib style: {plot_style}")
+    plt.style.use(plot_style)
+
+def write_summary(metrics, path='metrics_summary.txt'):
+    with open(path, 'w') as f:
+        f.write("Performance Metrics Summary\n")
+        f.write(f"Total Requests: {metrics['total_requests']}\n")
+        f.write(f"Operations: {', '.join(metrics['operations'])}\n")
+        f.write(f"Success Rate: {metrics['success_rate']:.2f}%\n")
+        f.write(f"Failure Rate: {metrics['failure_rate']:.2f}%\n")
+        f.write("Configuration:\n")
+        for key, value in metrics['config'].items():
+            f.write(f"  {key}: {value}\n")
+        f.write("Average Response Time (ms):\n")
+        for op, rt in metrics['avg_response_time'].items():
+            f.write(f"  {op}: {rt:.2f}\n")
+        f.write("Maximum Response Time (ms):\n")
+        for op, rt in metrics['max_response_time'].items():
+            f.write(f"  {op}: {rt:.2f}\n")
+        f.write("Response Time Percentiles (ms):\n")
+        for op, values in metrics['percentiles'].items():
+            f.write(f"  {op}: {', '.join(f'p{p:g}={value:.2f}' for p, value in values.items())}\n")
+        f.write("Corrected Response Time Percentiles (ms, from intended start; raw in parentheses):\n")
+        for op, values in metrics.get('corrected_percentiles', {}).items():
+            raw = metrics['percentiles'].get(op, {})
+            pairs = [f"p{p:g}={value:.2f} ({raw.get(p, float('nan')):.2f})" for p, value in values.items()]
+            f.write(f"  {op}: {', '.join(pairs)}\n")
+        if metrics.get('phases'):
+            f.write("Latency by Phase (mean ms over requests with PHASE_TIMING; reuse = kept-alive connections):\n")
+            for op, phases in metrics['phases'].items():
+                f.write(f"  {op}: connect={phases['connect_time']:.2f}, tls={phases['tls_time']:.2f}, "
+                        f"ttfb={phases['ttfb']:.2f}, body={phases['body_time']:.2f}, other={phases['other']:.2f}, "
+                        f"reuse={phases['reuse_rate']:.1f}% "
+                        f"(response time new connection={phases['new_connection_response_time']:.2f}, "
+                        f"reused={phases['reused_connection_response_time']:.2f}; {phases['requests']} requests)\n")
+        if metrics.get('transfer_rates'):
+            f.write("Push Throughput (MB/s over successful uploads that sent bytes):\n")
+            for op, rate in metrics['transfer_rates'].items():
+                f.write(f"  {op}: {rate['mb_per_second']:.2f} MB/s ({rate['mb']:.1f} MB in {rate['requests']} requests)\n")
+        f.write("Failure Counts:\n")
+        for op, count in metrics['failure_counts'].items():
+            f.write(f"  {op}: {count}\n")
+        generator = metrics.get('generator_health')
+        if generator:
+            f.write("Generator Health:\n")
+            f.write(f"  workers: {generator['workers']}, max CPU: {generator['max_cpu_percent']:.0f}%, "
+                    f"max loop lag: {generator['max_loop_lag_ms']:.1f} ms, max RSS: {generator['max_rss_mb']:.0f} MiB, "
+                    f"max open sockets: {generator['max_open_sockets']}\n")
+            for window in generator['saturated_windows']:
+                f.write(f"  WARNING: generator saturated on worker {window['worker_id']} "
+                        f"from {window['start']:%Y-%m-%dT%H:%M:%S} to {window['end']:%Y-%m-%dT%H:%M:%S} "
+                        f"(CPU up to {window['max_cpu_percent']:.0f}%, loop lag up to {window['max_loop_lag_ms']:.1f} ms)\n")
+
+def write_outputs(metrics, series, bucket_seconds, health, output_dir, plot_failures=None, plots=True):
+    """Write the series, plots and summary of one report into output_dir
+
+    Without plots matplotlib is never imported. Failure counts are drawn by
+    `plot_failures` if given, else as bars from the metrics.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    write_bucket_series(series, os.path.join(output_dir, 'timeseries.csv'), os.path.join(output_dir, 'timeseries.json'))
+    write_summary(metrics, os.path.join(output_dir, 'metrics_summary.txt'))
+    if not plots:
+        logging.info(f"Generated metrics_summary.txt, timeseries.csv, timeseries.json in {output_dir}")
+        return
+
+    import matplotlib.pyplot as plt
+
+    use_plot_style()
+    # Response time, throughput and error rate over time, with generator health when recorded
+    plot_bucket_series(series, bucket_seconds, os.path.join(output_dir, 'response_time.png'),
+                       health=health, generator_health=metrics['generator_health'])
+
+    # Failure counts by operation
+    plt.figure(figsize=(10, 6))
+    if plot_failures is not None:
+        plot_failures()
+    else:
+        plt.bar(list(metrics['failure_counts']), list(metrics['failure_counts'].values()))
+    plt.xlabel('Operation')
+    plt.ylabel('Failure Count')
+    plt.title('Failure Counts by Operation')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'failure_counts.png'))
+    plt.close()
+    logging.info(f"Generated response_time.png, failure_counts.png, metrics_summary.txt, timeseries.csv, "
+                 f"timeseries.json in {output_dir}")
+
+def analyze_report_streaming(csv_file, chunk_mb=DEFAULT_CHUNK_MB, bucket_seconds=DEFAULT_BUCKET_SECONDS,
+                             cpu_warn_percent=DEFAULT_CPU_WARN_PERCENT, lag_warn_ms=DEFAULT_LAG_WARN_MS,
+                             output_dir='.', use_cache=True, plots=True):
+    """Out-of-core analysis: one header scan, then chunked parsing with bounded memory
+
+    The accumulated state is cached next to the report, so re-running on an unchanged
+    report parses nothing and a report that has grown only parses the appended rows.
+    """
+    try:
+        cache, status, size, digest = load_analysis_cache(csv_file, bucket_seconds) if use_cache else ({}, None, None, None)
+        state = cache.get("stream") if status else None
+        if state and status == "grown" and not ends_on_row_boundary(csv_file, state["position"]):
+            # The last cached row had no newline yet and has been completed since: start over
+            state = None
+        if state:
+            accumulator = ReportAccumulator.from_state(state["accumulator"])
+            config, position = state["config"], state["position"]
+            change = "unchanged" if status == "unchanged" else f"{size - cache['size']} bytes appended"
+            logging.info(f"Resuming from the analysis cache ({change})")
+        else:
+            accumulator, config, position = ReportAccumulator(bucket_seconds), default_config(), None
+        for config, chunk, position in iter_report_positions(csv_file, chunk_mb, position, size):
+            accumulator.update(chunk)
+        if not accumulator.total_requests:
             logging.error("No metrics data found in CSV")
             raise ValueError("No metrics data")
-        
+        if use_cache:
+            save_analysis_cache(csv_file, bucket_seconds, size, digest, cache,
+                                stream={"accumulator": accumulator.to_state(), "config": config, "position": position})
+        metrics = accumulator.metrics(config)
+        health, metrics['generator_health'] = analyze_generator_health(csv_file, cpu_warn_percent, lag_warn_ms)
+
+        write_outputs(metrics, accumulator.bucket_series(), bucket_seconds, health, output_dir, plots=plots)
+        return metrics
+
+    except Exception as e:
+        logging.error(f"Failed to analyze report: {str(e)}")
+        raise
+
+def analyze_report(csv_file, bucket_seconds=DEFAULT_BUCKET_SECONDS,
+                   cpu_warn_percent=DEFAULT_CPU_WARN_PERCENT, lag_warn_ms=DEFAULT_LAG_WARN_MS, output_dir='.',
+                   use_cache=True, plots=True):
+    import pandas as pd
+    try:
+        # Exact percentiles need every row, so the cache is only reused while the report is unchanged
+        cache, status, size, digest = load_analysis_cache(csv_file, bucket_seconds) if use_cache else ({}, None, None, None)
+        if status == "unchanged" and "full" in cache:
+            logging.info("Report unchanged, using the cached analysis")
+            metrics, series = full_analysis_from_state(cache["full"])
+            health, metrics['generator_health'] = analyze_generator_health(csv_file, cpu_warn_percent, lag_warn_ms)
+            write_outputs(metrics, series, bucket_seconds, health, output_dir, plots=plots)
+            return metrics
+
+        # Read metrics
+        config, df = load_report(csv_file)
+
         # Ensure required columns with defaults
-        df['response_time'] = pd.to_numeric(df['response_time'], errors='coerce')
+        df['corrected_response_time'] = corrected_response_times(df)
         df['errors'] = pd.Series([''] * len(df), index=df.index)  # Default empty errors column
         df['user_id'] = pd.Series(['unknown'] * len(df), index=df.index)  # Default user_id
         df['repo_key'] = pd.Series(['unknown'] * len(df), index=df.index)  # Default repo_key
-        
+
         # Compute metrics
         metrics = {
             "total_requests": len(df),
@@ -64,72 +913,419 @@ def analyze_report(csv_file):
             "failure_rate": (df['status'] == 'failed').mean() * 100,
             "avg_response_time": df.groupby('operation')['response_time'].mean().to_dict(),
             "max_response_time": df.groupby('operation')['response_time'].max().to_dict(),
+            "percentiles": {
+                op: {p: rt.quantile(p / 100) for p in REPORTED_PERCENTILES}
+                for op, rt in df.groupby('operation')['response_time']
+            },
+            "corrected_percentiles": {
+                op: {p: rt.quantile(p / 100) for p in REPORTED_PERCENTILES}
+                for op, rt in df.groupby('operation')['corrected_response_time']
+            },
+            "phases": phase_breakdown(phase_sums(df)),
+            "transfer_rates": transfer_rates(transfer_sums(df)),
             "failure_counts": df[df['status'] == 'failed']['operation'].value_counts().to_dict(),
             "config": config
         }
-        
-        # Generate visualizations
-        available_styles = plt.style.available
-        plot_style = 'ggplot' if 'ggplot' in available_styles else 'default'
-        logging.info(f"Using matplotlib style: {plot_style}")
-        plt.style.use(plot_style)
-
-        # Response time over time
-        plt.figure(figsize=(12, 6))
-        for op in df['operation'].unique():
-            op_df = df[df['operation'] == op]
-            plt.plot(op_df['timestamp'], op_df['response_time'], label=op)
-        plt.xlabel('Timestamp')
-        plt.ylabel('Response Time (ms)')
-        plt.title('Response Time Over Time by Operation')
-        plt.legend()
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('response_time.png')
-        plt.close()
-        
-        # Failure counts by operation
-        plt.figure(figsize=(10, 6))
-        sns.countplot(data=df[df['status'] == 'failed'], x='operation')
-        plt.xlabel('Operation')
-        plt.ylabel('Failure Count')
-        plt.title('Failure Counts by Operation')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig('failure_counts.png')
-        plt.close()
-        
-        # Save metrics summary
-        with open('metrics_summary.txt', 'w') as f:
-            f.write("Performance Metrics Summary\n")
-            f.write(f"Total Requests: {metrics['total_requests']}\n")
-            f.write(f"Operations: {', '.join(metrics['operations'])}\n")
-            f.write(f"Success Rate: {metrics['success_rate']:.2f}%\n")
-            f.write(f"Failure Rate: {metrics['failure_rate']:.2f}%\n")
-            f.write("Configuration:\n")
-            for key, value in metrics['config'].items():
-                f.write(f"  {key}: {value}\n")
-            f.write("Average Response Time (ms):\n")
-            for op, rt in metrics['avg_response_time'].items():
-                f.write(f"  {op}: {rt:.2f}\n")
-            f.write("Maximum Response Time (ms):\n")
-            for op, rt in metrics['max_response_time'].items():
-                f.write(f"  {op}: {rt:.2f}\n")
-            f.write("Failure Counts:\n")
-            for op, count in metrics['failure_counts'].items():
-                f.write(f"  {op}: {count}\n")
-        
-        logging.info("Generated response_time.png, failure_counts.png, metrics_summary.txt")
+
+        # Time-bucketed series instead of raw points
+        series = compute_bucket_series(df, bucket_seconds)
+        # Not cached if rows were appended while parsing: they are not covered by the digest
+        if use_cache and os.path.getsize(csv_file) == size:
+            save_analysis_cache(csv_file, bucket_seconds, size, digest, cache,
+                                full=full_analysis_to_state(metrics, series))
+        metrics = dict(metrics)
+        health, metrics['generator_health'] = analyze_generator_health(csv_file, cpu_warn_percent, lag_warn_ms)
+
+        def plot_failures():
+            import seaborn as sns
+            sns.countplot(data=df[df['status'] == 'failed'], x='operation')
+
+        # Plots and summary
+        write_outputs(metrics, series, bucket_seconds, health, output_dir, plot_failures, plots)
         return metrics
-    
+
     except Exception as e:
         logging.error(f"Failed to analyze report: {str(e)}")
         raise
 
+def step_statistics(df, step_seconds=DEFAULT_STEP_SECONDS, warmup_seconds=DEFAULT_STEP_WARMUP_SECONDS,
+                    step_count=DEFAULT_STEP_COUNT):
+    """Per step and operation throughput, error rate and latency of a step-load run
+
+    Steps are counted from the first row, which completes within moments of the test
+    start. Only CAPACITY_OPERATIONS within the `step_count` steps count, so teardown
+    after the final step is left out. The first `warmup_seconds` of every step are
+    skipped, as is a final step cut shorter than its warm-up.
+    """
+    import pandas as pd
+
+    timestamps = pd.to_datetime(df['timestamp'], format='ISO8601')
+    elapsed = (timestamps - timestamps.min()).dt.total_seconds()
+    keep = df['operation'].isin(CAPACITY_OPERATIONS) & (elapsed < step_count * step_seconds)
+    if not keep.any():
+        raise ValueError(f"No samples of {', '.join(CAPACITY_OPERATIONS)} within the {step_count} step(s)")
+    df, elapsed = df[keep], elapsed[keep]
+    frame = pd.DataFrame({
+        "step": (elapsed // step_seconds).astype('int64'),
+        "operation": df['operation'],
+        "failed": df['status'] == 'failed',
+        "response_time": df['response_time'],
+    })[elapsed % step_seconds >= warmup_seconds]
+    # Measured span of each step; only the last one can be shorter
+    last_step = int(elapsed.max() // step_seconds)
+    measured = {step: step_seconds - warmup_seconds for step in range(last_step)}
+    measured[last_step] = elapsed.max() - last_step * step_seconds - warmup_seconds
+    grouped = frame.groupby(['step', 'operation'], observed=True)
+    stats = grouped.agg(requests=('failed', 'size'), errors=('failed', 'sum'))
+    successful = frame[~frame['failed']].groupby(['step', 'operation'], observed=True)['response_time']
+    stats['p50'] = successful.quantile(0.5)
+    stats['p99'] = successful.quantile(0.99)
+    stats = stats.reset_index()
+    stats = stats[stats['step'].map(measured) > 0]
+    stats['rps'] = stats['requests'] / stats['step'].map(measured)
+    stats['error_rate'] = stats['errors'] / stats['requests'] * 100
+    return stats.sort_values(['operation', 'step'])[STEP_COLUMNS].reset_index(drop=True)
+
+def find_knees(stats, slo_p99_ms=DEFAULT_SLO_P99_MS, slo_error_rate=DEFAULT_SLO_ERROR_RATE, operation_slos=None):
+    """First step where each operation breaks its p99 or error-rate SLO, and its max sustainable RPS
+
+    The sustainable RPS is the highest throughput of the steps before the knee (all
+    steps when the SLO held throughout, None when even the first step broke it).
+    Steps without a p99 (no successful timed samples) can still break the error-rate
+    SLO, but their latency is unknown, so they never count as sustainable.
+    """
+    operation_slos = operation_slos or {}
+    knees = {}
+    for op, rows in stats.groupby('operation', observed=True):
+        p99_limit = operation_slos.get(op, slo_p99_ms)
+        breaches = rows[(rows['p99'] > p99_limit) | (rows['error_rate'] > slo_error_rate)]
+        knee = breaches.iloc[0] if len(breaches) else None
+        before = rows if knee is None else rows[rows['step'] < knee['step']]
+        sustained = before[before['p99'].notna()]
+        reasons = []
+        if knee is not None and knee['p99'] > p99_limit:
+            reasons.append(f"p99 {knee['p99']:.0f} ms > {p99_limit:g} ms")
+        if knee is not None and knee['error_rate'] > slo_error_rate:
+            reasons.append(f"error rate {knee['error_rate']:.1f}% > {slo_error_rate:g}%")
+        knees[op] = {
+            "knee_step": None if knee is None else int(knee['step']),
+            "reason": ", ".join(reasons),
+            "max_sustainable_rps": float(sustained['rps'].max()) if len(sustained) else None,
+            "untimed_steps": [int(step) for step in before.loc[before['p99'].isna(), 'step']],
+            "peak_rps": float(rows['rps'].max()),
+            "p99_slo_ms": p99_limit,
+        }
+    return knees
+
+def capacity_outcome(knee):
+    """One-line verdict of find_knees for an operation"""
+    if knee['max_sustainable_rps'] is not None:
+        sustainable = f"max sustainable {knee['max_sustainable_rps']:.2f} rps"
+    else:
+        sustainable = "max sustainable none" if knee['knee_step'] is not None else "capacity unknown"
+    if knee['knee_step'] is not None:
+        outcome = f"knee at step {knee['knee_step']} ({knee['reason']})"
+    elif knee['max_sustainable_rps'] is not None:
+        outcome = "SLO held at every timed step"
+    else:
+        outcome = "no latency data at any step"
+    untimed = knee['untimed_steps']
+    if untimed and knee['max_sustainable_rps'] is not None:
+        outcome += f", no latency data at step(s) {', '.join(map(str, untimed))}"
+    return f"{sustainable}, {outcome}"
+
+def write_capacity(stats, knees, slo_error_rate, output_dir='.', plots=True):
+    """capacity.csv (per-step statistics), capacity_summary.txt and an RPS vs p99 plot"""
+    os.makedirs(output_dir, exist_ok=True)
+    stats.to_csv(os.path.join(output_dir, 'capacity.csv'), index=False, float_format='%.2f')
+    with open(os.path.join(output_dir, 'capacity_summary.txt'), 'w') as f:
+        f.write(f"Max sustainable throughput per operation (error rate SLO {slo_error_rate:g}%)\n")
+        for op, knee in knees.items():
+            f.write(f"  {op} (p99 SLO {knee['p99_slo_ms']:g} ms): {capacity_outcome(knee)}, "
+                    f"peak {knee['peak_rps']:.2f} rps\n")
+    for op, knee in knees.items():
+        logging.info(f"{op}: {capacity_outcome(knee)}, peak {knee['peak_rps']:.2f} rps")
+    if plots:
+        import matplotlib.pyplot as plt
+
+        use_plot_style()
+        fig, ax = plt.subplots(figsize=(10, 6))
+        for op, rows in stats.groupby('operation', observed=True):
+            ax.plot(rows['rps'], rows['p99'], marker='o', label=op)
+        ax.set_xlabel('Requests/sec (per step)')
+        ax.set_ylabel('p99 Response Time (ms)')
+        ax.set_title('Latency vs Throughput by Step')
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_dir, 'capacity.png'))
+        plt.close(fig)
+    logging.info(f"Generated capacity.csv, capacity_summary.txt{', capacity.png' if plots else ''} in {output_dir}")
+
+def parse_operation_slos(values):
+    """["create_watch=2000", ...] -> {"create_watch": 2000.0}"""
+    slos = {}
+    for value in values or []:
+        op, _, limit = value.partition('=')
+        slos[op] = float(limit)
+    return slos
+
+def write_live_summary(report_path, totals, window, path):
+    """Rolling and whole-run figures of a report being followed; replaced atomically on every refresh"""
+    lines = [f"Live summary of {os.path.basename(report_path)} at {datetime.now():%H:%M:%S}"]
+    if window.newest_ns is not None:
+        lines[0] += f" (newest row {datetime.fromtimestamp(window.newest_ns / 1e9):%H:%M:%S})"
+    error_rate = totals.failures / totals.total_requests * 100 if totals.total_requests else 0.0
+    lines.append(f"Total: {totals.total_requests} requests, {error_rate:.2f}% failed")
+    lines.append(f"Last {window.window_seconds:g}s by operation:")
+    for op, (rps, op_error_rate, histogram) in window.operations().items():
+        percentiles = ", ".join(f"p{p}={histogram.percentile(p):.0f}" for p in SERIES_PERCENTILES)
+        lines.append(f"  {op}: {rps:.1f} rps, {op_error_rate:.1f}% errors, {percentiles} ms")
+    lines.append("Whole run by operation:")
+    for op, acc in sorted(totals.operations.items()):
+        percentiles = ", ".join(f"p{p:g}={value:.0f}" for p, value in acc["histogram"].percentiles().items())
+        lines.append(f"  {op}: {acc['count']} requests, {acc['failures']} failed, {percentiles} ms")
+    text = "\n".join(lines) + "\n"
+    with open(path + ".tmp", 'w') as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+    return text
+
+def follow_report(report_path, refresh_seconds=DEFAULT_REFRESH_SECONDS, window_seconds=DEFAULT_WINDOW_SECONDS,
+                  chunk_mb=DEFAULT_CHUNK_MB, output_dir='.', idle_exit=0):
+    """Tail a report while the test is running and refresh live_summary.txt every `refresh_seconds`
+
+    Only rows appended since the last refresh are parsed. Rolling figures cover the
+    last `window_seconds` of report time; whole-run figures come from constant-size
+    per-operation histograms. Runs until interrupted, or until the report has not
+    grown for `idle_exit` seconds when that is set.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, 'live_summary.txt')
+    totals = ReportAccumulator(series=False)
+    window = RollingWindow(window_seconds)
+    config, position, size = default_config(), None, 0
+    last_growth = time.monotonic()
+    logging.info(f"Following {report_path}, refreshing {summary_path} every {refresh_seconds:g}s (Ctrl+C to stop)")
+    try:
+        while True:
+            current_size = os.path.getsize(report_path) if os.path.exists(report_path) else 0
+            parsed = totals.total_requests
+            if current_size > size:
+                size = current_size
+                last_growth = time.monotonic()
+                try:
+                    for config, chunk, position in iter_report_positions(report_path, chunk_mb, position, size,
+                                                                         hold_partial=True):
+                        totals.update(chunk)
+                        window.update(chunk)
+                except ValueError:
+                    if position is not None:
+                        raise
+                    size = 0  # Header not fully written yet, retry on the next refresh
+            elif idle_exit and time.monotonic() - last_growth >= idle_exit:
+                logging.info(f"{report_path} has not grown for {idle_exit:g}s, stopping")
+                break
+            if totals.total_requests > parsed:
+                for line in write_live_summary(report_path, totals, window, summary_path).splitlines():
+                    logging.info(line)
+            time.sleep(refresh_seconds)
+    except KeyboardInterrupt:
+        logging.info(f"Stopped following {report_path}")
+    if totals.total_requests:
+        write_live_summary(report_path, totals, window, summary_path)
+    return totals.metrics(config) if totals.total_requests else None
+
+def load_latency_samples(path, metric='response_time', chunk_mb=DEFAULT_CHUNK_MB, seed=0):
+    """Successful requests' latencies per operation, subsampled to COMPARE_MAX_SAMPLES for bootstrapping"""
+    import pandas as pd
+    import numpy as np
+
+    samples = {}
+    for _, chunk in iter_report_chunks(path, chunk_mb):
+        chunk['response_time'] = pd.to_numeric(chunk['response_time'], errors='coerce')
+        if metric == 'corrected_response_time':
+            chunk['corrected_response_time'] = corrected_response_times(chunk)
+        successful = chunk[chunk['status'] == 'success']
+        for op, values in successful.groupby('operation', observed=True)[metric]:
+            samples.setdefault(str(op), []).append(values.dropna().to_numpy(dtype='float64'))
+    rng = np.random.default_rng(seed)
+    result = {}
+    for op, parts in samples.items():
+        values = np.concatenate(parts)
+        if len(values) > COMPARE_MAX_SAMPLES:
+            values = rng.choice(values, COMPARE_MAX_SAMPLES, replace=False)
+        result[op] = values
+    return result
+
+def bootstrap_percentile_deltas(task):
+    """Candidate minus baseline percentiles with bootstrap confidence intervals for one operation
+
+    Both samples are resampled independently with replacement; the interval is the
+    central `confidence` share of the resampled deltas.
+    """
+    import numpy as np
+
+    baseline, candidate, percentiles, iterations, confidence, seed = task
+    rng = np.random.default_rng(seed)
+    deltas = np.empty((iterations, len(percentiles)))
+    for i in range(iterations):
+        deltas[i] = (np.percentile(rng.choice(candidate, len(candidate)), percentiles)
+                     - np.percentile(rng.choice(baseline, len(baseline)), percentiles))
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(deltas, [tail, 100 - tail], axis=0)
+    return np.percentile(baseline, percentiles), np.percentile(candidate, percentiles), low, high
+
+def compare_reports(baseline_path, candidate_paths, metric='response_time', iterations=DEFAULT_BOOTSTRAP_ITERATIONS,
+                    confidence=DEFAULT_CONFIDENCE, regression_percent=DEFAULT_REGRESSION_PERCENT,
+                    chunk_mb=DEFAULT_CHUNK_MB, seed=0, processes=None, min_samples=DEFAULT_MIN_SAMPLES):
+    """Per-operation percentile deltas of each candidate against the baseline
+
+    Reports are loaded and bootstrapped in a process pool. A delta is a regression
+    when both sides have at least `min_samples` samples, its whole confidence interval
+    is above zero and the candidate is at least `regression_percent` slower, so noise
+    and negligible shifts don't fail the gate.
+    """
+    import pandas as pd
+
+    paths = [baseline_path] + list(candidate_paths)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        loaded = list(pool.map(load_latency_samples, paths, [metric] * len(paths), [chunk_mb] * len(paths),
+                               [seed + i for i in range(len(paths))]))
+        baseline = loaded[0]
+        pairs, tasks = [], []
+        for path, samples in zip(candidate_paths, loaded[1:]):
+            for op in sorted(samples):
+                if op not in baseline:
+                    continue
+                if not len(baseline[op]) or not len(samples[op]):
+                    # e.g. push_image rows without a response time
+                    empty = 'the baseline' if not len(baseline[op]) else os.path.basename(path)
+                    logging.warning(f"{op} has no successful timed samples in {empty}; not compared")
+                    continue
+                pairs.append((path, op))
+                tasks.append((baseline[op], samples[op], COMPARE_PERCENTILES, iterations, confidence, seed + len(tasks)))
+        results = list(pool.map(bootstrap_percentile_deltas, tasks))
+    rows = []
+    for (path, op), task, (base, cand, low, high) in zip(pairs, tasks, results):
+        for i, p in enumerate(COMPARE_PERCENTILES):
+            delta = cand[i] - base[i]
+            delta_percent = delta / base[i] * 100 if base[i] else float('nan')
+            enough = min(len(task[0]), len(task[1])) >= min_samples
+            rows.append([os.path.basename(path), op, p, base[i], cand[i], delta, delta_percent, low[i], high[i],
+                         len(task[0]), len(task[1]), bool(enough and low[i] > 0 and delta_percent >= regression_percent)])
+    for path, samples in zip(candidate_paths, loaded[1:]):
+        for op in sorted(set(baseline) ^ set(samples)):
+            logging.warning(f"{op} is only in {'the baseline' if op in baseline else os.path.basename(path)}; not compared")
+    return pd.DataFrame(rows, columns=COMPARE_COLUMNS)
+
+def write_comparison(comparison, baseline_path, confidence, output_dir='.', min_samples=DEFAULT_MIN_SAMPLES):
+    """Persist the comparison as CSV plus a readable summary, logging every regression"""
+    os.makedirs(output_dir, exist_ok=True)
+    comparison.to_csv(os.path.join(output_dir, 'comparison.csv'), index=False, float_format='%.2f')
+    with open(os.path.join(output_dir, 'comparison_summary.txt'), 'w') as f:
+        f.write(f"Baseline: {os.path.basename(baseline_path)}\n")
+        f.write(f"Percentile deltas (ms, candidate - baseline) with {confidence:.0%} bootstrap confidence intervals\n")
+        for (candidate, op), rows in comparison.groupby(['candidate', 'operation'], sort=False):
+            first = rows.iloc[0]
+            few = "" if min(first['baseline_samples'], first['candidate_samples']) >= min_samples \
+                else f" (fewer than {min_samples} samples, not gated)"
+            f.write(f"{candidate} {op}: {first['baseline_samples']} vs {first['candidate_samples']} samples{few}\n")
+            for row in rows.itertuples():
+                flag = "  REGRESSION" if row.regression else ""
+                f.write(f"  p{row.percentile}: {row.baseline_ms:.2f} -> {row.candidate_ms:.2f} "
+                        f"({row.delta_ms:+.2f}, {row.delta_percent:+.1f}%, CI {row.ci_low_ms:+.2f}..{row.ci_high_ms:+.2f}){flag}\n")
+    for row in comparison[comparison['regression']].itertuples():
+        logging.warning(f"Regression in {row.candidate}: {row.operation} p{row.percentile} {row.baseline_ms:.2f} -> "
+                        f"{row.candidate_ms:.2f} ms ({row.delta_percent:+.1f}%, CI {row.ci_low_ms:+.2f}..{row.ci_high_ms:+.2f} ms)")
+    logging.info(f"Generated comparison.csv, comparison_summary.txt in {output_dir}")
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        logging.error("Usage: python analysis.py <csv_file>")
-        sys.exit(1)
-    csv_file = sys.argv[1]
-    metrics = analyze_report(csv_file)
-    print(f"Analysis complete. See response_time.png, failure_counts.png, and metrics_summary.txt")
+    parser = argparse.ArgumentParser(description="Analyze a Locust performance report")
+    parser.add_argument("csv_file", nargs="?",
+                        help="performance_report_YYYYMMDD_HHMMSS.csv (or .jfrperf binary report) to analyze")
+    parser.add_argument("--stream", action="store_true",
+                        help="Out-of-core mode for large reports: chunked parsing with bounded memory")
+    parser.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK_MB,
+                        help=f"Size of each parsed chunk in streaming mode (default {DEFAULT_CHUNK_MB})")
+    parser.add_argument("--bucket-seconds", type=int, default=DEFAULT_BUCKET_SECONDS,
+                        help=f"Width of the time buckets for the throughput/latency series (default {DEFAULT_BUCKET_SECONDS})")
+    parser.add_argument("--cpu-warn-percent", type=float, default=DEFAULT_CPU_WARN_PERCENT,
+                        help=f"Generator CPU %% at which a worker counts as saturated (default {DEFAULT_CPU_WARN_PERCENT})")
+    parser.add_argument("--lag-warn-ms", type=float, default=DEFAULT_LAG_WARN_MS,
+                        help=f"Generator loop lag at which a worker counts as saturated (default {DEFAULT_LAG_WARN_MS})")
+    parser.add_argument("--export-csv", metavar="CSV_FILE",
+                        help="Convert a binary report to CSV and exit")
+    parser.add_argument("--output-dir", default=".", help="Directory for the generated files (default: current)")
+    parser.add_argument("--follow", action="store_true",
+                        help="Tail a report that is still being written and refresh live_summary.txt")
+    parser.add_argument("--refresh-seconds", type=float, default=DEFAULT_REFRESH_SECONDS,
+                        help=f"Refresh interval in --follow mode (default {DEFAULT_REFRESH_SECONDS})")
+    parser.add_argument("--window-seconds", type=float, default=DEFAULT_WINDOW_SECONDS,
+                        help=f"Rolling window of the live figures in --follow mode (default {DEFAULT_WINDOW_SECONDS})")
+    parser.add_argument("--idle-exit", type=float, default=0,
+                        help="Stop following once the report has not grown for this many seconds (default: never)")
+    parser.add_argument("--knee", action="store_true",
+                        help="Step-load capacity analysis (LOAD_SHAPE=step runs): max sustainable RPS per operation")
+    parser.add_argument("--step-seconds", type=float, default=DEFAULT_STEP_SECONDS,
+                        help=f"Duration of each load step, STEP_DURATION of the run (default {DEFAULT_STEP_SECONDS})")
+    parser.add_argument("--step-count", type=int, default=DEFAULT_STEP_COUNT,
+                        help=f"Number of load steps, STEP_COUNT of the run; later samples are ignored (default {DEFAULT_STEP_COUNT})")
+    parser.add_argument("--step-warmup", type=float, default=DEFAULT_STEP_WARMUP_SECONDS,
+                        help=f"Seconds skipped at the start of every step (default {DEFAULT_STEP_WARMUP_SECONDS})")
+    parser.add_argument("--slo-p99-ms", type=float, default=DEFAULT_SLO_P99_MS,
+                        help=f"p99 latency SLO of successful requests (default {DEFAULT_SLO_P99_MS})")
+    parser.add_argument("--slo", action="append", metavar="OPERATION=MS",
+                        help="Per-operation p99 SLO overriding --slo-p99-ms, e.g. create_watch=3000 (repeatable)")
+    parser.add_argument("--slo-error-rate", type=float, default=DEFAULT_SLO_ERROR_RATE,
+                        help=f"Error rate SLO in percent (default {DEFAULT_SLO_ERROR_RATE})")
+    parser.add_argument("--no-plots", action="store_true",
+                        help="Only write the summary and series (skips matplotlib entirely)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Neither read nor write the <report>{CACHE_SUFFIX} analysis cache")
+    parser.add_argument("--compare", nargs="+", metavar="REPORT",
+                        help="Compare these reports against the baseline csv_file; exits 1 on a significant regression")
+    parser.add_argument("--metric", choices=("response_time", "corrected_response_time"), default="response_time",
+                        help="Latency compared in --compare mode (default response_time)")
+    parser.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP_ITERATIONS,
+                        help=f"Bootstrap resamples per operation (default {DEFAULT_BOOTSTRAP_ITERATIONS})")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help=f"Confidence level of the intervals (default {DEFAULT_CONFIDENCE})")
+    parser.add_argument("--regression-percent", type=float, default=DEFAULT_REGRESSION_PERCENT,
+                        help=f"Smallest significant slowdown that counts as a regression (default {DEFAULT_REGRESSION_PERCENT}%%)")
+    parser.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES,
+                        help=f"Samples needed on both sides before a delta can count as a regression (default {DEFAULT_MIN_SAMPLES})")
+    parser.add_argument("--processes", type=int, help="Worker processes for --compare (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for subsampling and bootstrapping")
+    args = parser.parse_args()
+    if args.csv_file is None:
+        parser.error("a report to analyze (or the --compare baseline) is required")
+    if args.compare:
+        comparison = compare_reports(args.csv_file, args.compare, args.metric, args.bootstrap, args.confidence,
+                                     args.regression_percent, args.chunk_mb, args.seed, args.processes, args.min_samples)
+        write_comparison(comparison, args.csv_file, args.confidence, args.output_dir, args.min_samples)
+        regressions = int(comparison['regression'].sum())
+        print(f"Comparison complete: {regressions} regression(s). See {os.path.join(args.output_dir, 'comparison_summary.txt')}")
+        sys.exit(1 if regressions else 0)
+    if args.knee:
+        _, df = load_report(args.csv_file)
+        stats = step_statistics(df, args.step_seconds, args.step_warmup, args.step_count)
+        knees = find_knees(stats, args.slo_p99_ms, args.slo_error_rate, parse_operation_slos(args.slo))
+        write_capacity(stats, knees, args.slo_error_rate, args.output_dir, not args.no_plots)
+        print(f"Capacity analysis complete. See {os.path.join(args.output_dir, 'capacity_summary.txt')}")
+        sys.exit(0)
+    if args.follow:
+        follow_report(args.csv_file, args.refresh_seconds, args.window_seconds, args.chunk_mb, args.output_dir,
+                      args.idle_exit)
+        sys.exit(0)
+    if args.export_csv:
+        export_csv(args.csv_file, args.export_csv, args.chunk_mb)
+        print(f"Exported {args.csv_file} to {args.export_csv}")
+    elif args.stream:
+        metrics = analyze_report_streaming(args.csv_file, args.chunk_mb, args.bucket_seconds,
+                                           args.cpu_warn_percent, args.lag_warn_ms, args.output_dir,
+                                           not args.no_cache, not args.no_plots)
+        print(f"Analysis complete. See response_time.png, failure_counts.png, metrics_summary.txt and timeseries.csv/json")
+    else:
+        metrics = analyze_report(args.csv_file, args.bucket_seconds, args.cpu_warn_percent, args.lag_warn_ms,
+                                 args.output_dir, not args.no_cache, not args.no_plots)
+        print(f"Analysis complete. See response_time.png, failure_counts.png, metrics_summary.txt and timeseries.csv/json")
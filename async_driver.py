@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+import jfrog_api
+import payloads
+from binary_report import BinaryReportWriter, BINARY_EXTENSION
+from config import (
+    JFROG_URL, REPORT_FORMAT, METRICS_FLUSH_INTERVAL, METRICS_BATCH_SIZE, JOURNEY_WEIGHT, READ_WEIGHT,
+    RESOURCE_POOL_MAX, RESOURCE_CLEANUP
+)
+from metrics_recorder import MetricsRecorder, OPERATIONS
+from report_writer import CsvReportWriter, write_percentiles
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logging.basicConfig(level=logging.INFO)
+# httpx logs every request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Standalone open-model load driver: requests arrive on a schedule (constant or Poisson
+# rate) regardless of how fast the server answers, so a stalled server shows up as
+# latency instead of silently lowering the offered load as closed-loop Locust users do.
+# It runs the same Artifactory/Xray operations and writes the same report as locustfile.py.
+
+
+class AsyncDriver:
+    """Runs journeys (repo -> policy -> watch -> violations) and violation reads at a target arrival rate
+
+    Image pushes and scan waits need the Docker client, so journeys here stop at the
+    watch; use locustfile.py for push and scan timings.
+    """
+
+    def __init__(self, client, recorder, concurrency, journey_weight, read_weight):
+        self.client = client
+        self.metrics = recorder.new_buffer()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.scenarios = [self.journey, self.read]
+        self.weights = [journey_weight, read_weight]
+        self.resource_sets = []  # completed sets, most recent last, capped at RESOURCE_POOL_MAX
+        self.created = {kind: [] for kind in jfrog_api.DELETE_ENDPOINTS}
+        self.arrivals = 0
+        self.delayed_arrivals = 0
+
+    async def request(self, operation, method, url, body=None, intended_start=None):
+        """Send one request and record it, with its intended start when it was scheduled"""
+        started = time.perf_counter()
+        length = 0
+        try:
+            response = await self.client.request(
+                method, url, content=body,
+                headers=payloads.JSON_HEADERS if body is not None else payloads.AUTH_HEADER
+            )
+            success = response.status_code in jfrog_api.SUCCESS_STATUSES[operation]
+            length = len(response.content)
+            if not success:
+                logging.debug(f"{operation} failed with {response.status_code}: {response.text[:200]}")
+        except httpx.HTTPError as e:
+            success = False
+            logging.debug(f"{operation} failed: {e}")
+        # Time between the scheduled arrival and the actual send (waiting for a slot, loop delays)
+        lag_ms = (started - intended_start) * 1000 if intended_start is not None else 0.0
+        self.metrics.record(operation, (time.perf_counter() - started) * 1000, success, length, lag_ms)
+        return success
+
+    async def journey(self, intended_start):
+        repo_key = jfrog_api.new_repo_key()
+        if not await self.request("create_repository", "PUT", f"/artifactory/api/repositories/{repo_key}",
+                                  payloads.REPOSITORY.render(repo_key=repo_key), intended_start=intended_start):
+            return
+        self.created["repository"].append(repo_key)
+        policy_name = jfrog_api.new_policy_name()
+        if not await self.request("create_policy", "POST", "/xray/api/v2/policies",
+                                  payloads.POLICY.render(policy_name=policy_name)):
+            return
+        self.created["policy"].append(policy_name)
+        watch_name = jfrog_api.new_watch_name()
+        if not await self.request("create_watch", "POST", "/xray/api/v2/watches",
+                                  payloads.WATCH.render(watch_name=watch_name, repo_key=repo_key,
+                                                        policy_name=policy_name)):
+            return
+        self.created["watch"].append(watch_name)
+        resources = {"repo_key": repo_key, "watch_name": watch_name}
+        await self.get_violations(resources)
+        self.resource_sets.append(resources)
+        del self.resource_sets[:-RESOURCE_POOL_MAX]
+
+    async def read(self, intended_start):
+        if not self.resource_sets:
+            # Nothing to read yet: a journey creates the first set
+            return await self.journey(intended_start)
+        await self.get_violations(random.choice(self.resource_sets), intended_start)
+
+    async def get_violations(self, resources, intended_start=None):
+        return await self.request(
+            "get_violations", "POST", "/xray/api/v1/violations",
+            payloads.VIOLATIONS.render(watch_name=resources["watch_name"], repo_key=resources["repo_key"],
+                                       path=jfrog_api.ARTIFACT_PATH),
+            intended_start=intended_start
+        )
+
+    async def arrive(self, intended_start):
+        """One arrival: wait for a concurrency slot (counted in its corrected latency) and run a scenario"""
+        if self.semaphore.locked():
+            # Every slot is taken: this arrival queues behind the in-flight ones
+            self.delayed_arrivals += 1
+        async with self.semaphore:
+            scenario = random.choices(self.scenarios, self.weights)[0]
+            await scenario(intended_start)
+
+    async def run(self, rate, duration, arrival):
+        """Schedule arrivals at `rate` per second for `duration` seconds, independent of responses"""
+        pending = set()
+        started = time.perf_counter()
+        intended_start = started
+        while intended_start < started + duration:
+            delay = intended_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self.arrive(intended_start))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            self.arrivals += 1
+            intended_start += random.expovariate(rate) if arrival == 'poisson' else 1.0 / rate
+        if pending:
+            logging.info(f"Waiting for {len(pending)} in-flight arrival(s)")
+            await asyncio.gather(*pending)
+
+    async def cleanup(self):
+        """Delete everything created: watches, then policies, then repositories"""
+        for kind, (operation, url) in jfrog_api.DELETE_ENDPOINTS.items():
+            async def delete(name):
+                async with self.semaphore:
+                    await self.request(operation, "DELETE", url.format(name))
+            await asyncio.gather(*(delete(name) for name in self.created[kind]))
+            self.created[kind].clear()
+
+
+def open_report_writers():
+    prefix = f"performance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    writers = []
+    if REPORT_FORMAT in ('csv', 'both'):
+        writers.append(CsvReportWriter(f"{prefix}.csv"))
+    if REPORT_FORMAT in ('binary', 'both'):
+        writers.append(BinaryReportWriter(f"{prefix}{BINARY_EXTENSION}"))
+    return prefix, writers
+
+
+def flush_metrics(recorder, writers):
+    for batch in recorder.drain(METRICS_BATCH_SIZE):
+        for writer in writers:
+            writer.write_batch(batch)
+
+
+async def flush_loop(recorder, writers):
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+        flush_metrics(recorder, writers)
+
+
+async def main_async(args):
+    recorder = MetricsRecorder()
+    prefix, writers = open_report_writers()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.host, limits=limits, timeout=args.timeout) as client:
+        driver = AsyncDriver(client, recorder, args.concurrency, args.journey_weight, args.read_weight)
+        flusher = asyncio.create_task(flush_loop(recorder, writers))
+        logging.info(f"Driving {args.arrival} arrivals at {args.rate}/s for {args.duration}s "
+                     f"against {args.host} (concurrency {args.concurrency})")
+        started = time.perf_counter()
+        try:
+            await driver.run(args.rate, args.duration, args.arrival)
+        finally:
+            elapsed = time.perf_counter() - started
+            if RESOURCE_CLEANUP and not args.no_cleanup:
+                await driver.cleanup()
+            flusher.cancel()
+            flush_metrics(recorder, writers)
+            for writer in writers:
+                writer.close()
+    logging.info(f"{driver.arrivals} arrivals in {elapsed:.1f}s ({driver.arrivals / elapsed:.1f}/s); "
+                 f"{driver.delayed_arrivals} waited for a free slot (raise --concurrency if this is high)")
+    histograms = {OPERATIONS[op_id]: h for op_id, h in enumerate(recorder.histograms) if h.total_count}
+    if histograms:
+        write_percentiles(prefix.replace("performance_report_", "latency_percentiles_") + ".csv", histograms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-model asyncio/httpx load driver for Artifactory/Xray")
+    parser.add_argument("--host", default=JFROG_URL)
+    parser.add_argument("--rate", type=float, default=10.0, help="Arrivals per second (default 10)")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="constant",
+                        help="Evenly spaced or Poisson (exponential gaps) arrivals")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of arrivals (default 60)")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="Most arrivals in flight at once; later ones queue and the wait counts as latency")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--journey-weight", type=int, default=JOURNEY_WEIGHT)
+    parser.add_argument("--read-weight", type=int, default=READ_WEIGHT)
+    parser.add_argument("--no-cleanup", action="store_true", help="Keep the repositories, policies and watches")
+    args = parser.parse_args()
+    if httpx is None:
+        parser.error("async_driver.py needs httpx: pip install httpx")
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from mock_server import LatencyDistribution
+import payloads
+
+logging.basicConfig(level=logging.INFO)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOCUSTFILE = os.path.join(ROOT, "locustfile.py")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Mock server did not start listening on port {port}")
+
+
+def start_mock_server(port, latency, error_rate, log):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "mock_server.py"), "--port", str(port),
+         "--latency", latency, "--error-rate", str(error_rate)],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    wait_for_port(port)
+    return process
+
+
+def read_aggregated_stats(stats_csv):
+    with open(stats_csv, newline='') as f:
+        for row in csv.DictReader(f):
+            if row["Name"] == "Aggregated":
+                return row
+    raise RuntimeError(f"No aggregated row in {stats_csv}")
+
+
+def run_locust(host, users, duration, workdir, extra_env=None, extra_args=()):
+    """Run one headless single-process Locust (one worker) and measure its CPU via wait4"""
+    prefix = os.path.join(workdir, f"bench_{users}")
+    env = dict(os.environ, JFROG_DOCKER_ENABLED="false", WAIT_TIME_MIN="0", WAIT_TIME_MAX="0",
+               **(extra_env or {}))
+    cmd = [
+        sys.executable, "-m", "locust", "-f", LOCUSTFILE, "--headless",
+        "-u", str(users), "-r", str(users), "-t", f"{duration}s", "--host", host,
+        "--csv", prefix, "--only-summary", "--stop-timeout", "5",
+        *extra_args
+    ]
+    with open(f"{prefix}.log", "w") as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, _, rusage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+    stats = read_aggregated_stats(f"{prefix}_stats.csv")
+    requests = int(stats["Request Count"])
+    cpu_seconds = rusage.ru_utime + rusage.ru_stime
+    return {
+        "users": users,
+        "requests": requests,
+        "failures": int(stats["Failure Count"]),
+        "rps": float(stats["Requests/s"]),
+        "avg_response_time_ms": float(stats["Average Response Time"]),
+        "cpu_seconds": cpu_seconds,
+        "cpu_utilization": cpu_seconds / wall,
+        "cpu_ms_per_request": cpu_seconds * 1000 / requests if requests else float('nan'),
+    }
+
+
+def mean_latency_ms(spec, samples=20000):
+    distribution = LatencyDistribution(spec)
+    return sum(distribution.sample_seconds() for _ in range(samples)) * 1000 / samples
+
+
+def print_results(results, server_latency_ms):
+    print(f"{'users':>6} {'requests':>9} {'rps':>9} {'avg ms':>8} {'overhead ms':>11} {'cpu %':>6} {'cpu ms/req':>10}")
+    for r in results:
+        print(f"{r['users']:>6} {r['requests']:>9} {r['rps']:>9.1f} {r['avg_response_time_ms']:>8.2f} "
+              f"{r['client_overhead_ms']:>11.2f} {r['cpu_utilization'] * 100:>6.1f} {r['cpu_ms_per_request']:>10.3f}")
+    best = max(results, key=lambda r: r["rps"])
+    print(f"Max achievable RPS per worker: {best['rps']:.1f} at {best['users']} users "
+          f"(server latency mean {server_latency_ms:.2f} ms)")
+
+
+def sweep_users(args, extra_env=None):
+    """Run every user count of args.users against a fresh mock server"""
+    server_latency_ms = mean_latency_ms(args.latency)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="jfrog_bench_") as workdir:
+        port = free_port()
+        with open(os.path.join(workdir, "mock_server.log"), "w") as log:
+            server = start_mock_server(port, args.latency, args.error_rate, log)
+            try:
+                for users in args.users:
+                    logging.info(f"Benchmarking {users} users for {args.duration}s {extra_env or ''}")
+                    result = run_locust(f"http://127.0.0.1:{port}", users, args.duration, workdir, extra_env)
+                    # Time spent in the client beyond what the server was told to wait
+                    result["client_overhead_ms"] = result["avg_response_time_ms"] - server_latency_ms
+                    results.append(result)
+            finally:
+                server.terminate()
+                server.wait()
+    return results, server_latency_ms
+
+
+def write_results(results, output):
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Results written to {output}")
+
+
+def loadgen_benchmark(args):
+    """Sweep user counts against the mock server and report the generator's ceiling"""
+    results, server_latency_ms = sweep_users(args)
+    print_results(results, server_latency_ms)
+    write_results(results, args.output)
+    return results
+
+
+def user_class_benchmark(args):
+    """Compare HttpUser and FastHttpUser: users and RPS one core can drive, and client overhead"""
+    results = {}
+    for user_class in ("http", "fast"):
+        results[user_class], server_latency_ms = sweep_users(args, {"USER_CLASS": user_class})
+    print(f"{'users':>6} {'class':>6} {'rps':>9} {'overhead ms':>11} {'cpu %':>6} {'cpu ms/req':>10} "
+          f"{'users/core':>10} {'rps/core':>9}")
+    for http_result, fast_result in zip(results["http"], results["fast"]):
+        for user_class, r in (("http", http_result), ("fast", fast_result)):
+            # Extrapolated to one fully busy core at the same per-user request rate
+            r["users_per_core"] = r["users"] / r["cpu_utilization"] if r["cpu_utilization"] else float('nan')
+            r["rps_per_core"] = r["rps"] / r["cpu_utilization"] if r["cpu_utilization"] else float('nan')
+            print(f"{r['users']:>6} {user_class:>6} {r['rps']:>9.1f} {r['client_overhead_ms']:>11.2f} "
+                  f"{r['cpu_utilization'] * 100:>6.1f} {r['cpu_ms_per_request']:>10.3f} "
+                  f"{r['users_per_core']:>10.0f} {r['rps_per_core']:>9.0f}")
+    for user_class, class_results in results.items():
+        best = max(class_results, key=lambda r: r["rps"])
+        print(f"{user_class}: max {best['rps']:.1f} RPS at {best['users']} users "
+              f"(server latency mean {server_latency_ms:.2f} ms)")
+    write_results(results, args.output)
+    return results
+
+
+# (operation, template, sample values, fields that are unique per request) for every templated body
+PAYLOAD_SAMPLES = [
+    ("create_repository", payloads.REPOSITORY, {"repo_key": "docker-local-1a2b3c4d-17"}, ("repo_key",)),
+    ("create_policy", payloads.POLICY, {"policy_name": "sec_policy-1a2b3c4d-18"}, ("policy_name",)),
+    ("create_watch", payloads.WATCH,
+     {"watch_name": "watch-1a2b3c4d-19", "repo_key": "docker-local-1a2b3c4d-17", "policy_name": "sec_policy-1a2b3c4d-18"},
+     ("watch_name",)),
+    ("check_scan_status", payloads.ARTIFACT_STATUS,
+     {"repo_key": "docker-local-1a2b3c4d-17", "path": "alpine/3.9/manifest.json"}, ()),
+    ("get_violations", payloads.VIOLATIONS,
+     {"watch_name": "watch-1a2b3c4d-19", "repo_key": "docker-local-1a2b3c4d-17", "path": "alpine/3.9/manifest.json"}, ()),
+]
+
+
+def cpu_us_per_call(func, values, unique_fields, iterations):
+    """CPU microseconds per func(**values); unique fields get a fresh value each call, like created names"""
+    calls = [
+        {**values, **{field: f"{values[field]}-{i}" for field in unique_fields}} if unique_fields else values
+        for i in range(iterations)
+    ]
+    started = time.process_time_ns()
+    for call in calls:
+        func(**call)
+    return (time.process_time_ns() - started) / iterations / 1000
+
+
+def payloads_benchmark(args):
+    """Per-request client CPU to produce each body: rebuilt dict + stdlib json vs precomputed template"""
+    encoder = "orjson" if payloads.orjson is not None else "json (orjson not installed)"
+    print(f"{'operation':<18} {'dict+json us':>12} {'dict+fast us':>12} {'template us':>11} {'speedup':>8}")
+    results = []
+    for operation, template, values, unique_fields in PAYLOAD_SAMPLES:
+        assert json.loads(template.render(**values)) == template.builder(**values)
+        # What `client.post(json=...)` did per request: build the dict, then requests' json.dumps + encode
+        before = cpu_us_per_call(lambda **v: json.dumps(template.builder(**v), allow_nan=False).encode('utf-8'),
+                                 values, unique_fields, args.iterations)
+        fast = cpu_us_per_call(lambda **v: payloads.dumps(template.builder(**v)), values, unique_fields, args.iterations)
+        after = cpu_us_per_call(template.render, values, unique_fields, args.iterations)
+        results.append({"operation": operation, "dict_json_us": before, "dict_fast_us": fast, "template_us": after})
+        print(f"{operation:<18} {before:>12.2f} {fast:>12.2f} {after:>11.2f} {before / after:>7.1f}x")
+    print(f"Fast encoder: {encoder}; {args.iterations} iterations per measurement")
+    write_results(results, args.output)
+    return results
+
+
+def add_sweep_arguments(parser, default_users):
+    parser.add_argument("--users", type=lambda v: [int(u) for u in v.split(',')], default=default_users,
+                        help=f"Comma-separated user counts to sweep (default {','.join(map(str, default_users))})")
+    parser.add_argument("--duration", type=int, default=30, help="Seconds per step (default 30)")
+    parser.add_argument("--latency", default="fixed:0", help="Mock server latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock server error rate")
+    parser.add_argument("--output", help="Write results as JSON")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hermetic benchmarks for the JFrog load generator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    loadgen = subparsers.add_parser("loadgen", help="Drive locustfile.py against mock_server.py")
+    add_sweep_arguments(loadgen, default_users=[10, 50, 100, 200])
+    loadgen.set_defaults(func=loadgen_benchmark)
+
+    user_classes = subparsers.add_parser("userclass", help="Compare USER_CLASS=http and USER_CLASS=fast")
+    add_sweep_arguments(user_classes, default_users=[50, 200, 500])
+    user_classes.set_defaults(func=user_class_benchmark)
+
+    payload = subparsers.add_parser("payloads", help="Micro-benchmark request body serialization CPU")
+    payload.add_argument("--iterations", type=int, default=100000, help="Calls per measurement (default 100000)")
+    payload.add_argument("--output", help="Write results as JSON")
+    payload.set_defaults(func=payloads_benchmark)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import logging
+import struct
+from metrics_recorder import OPERATIONS, STATUSES, decode_columns
+
+# File layout: MAGIC, uint32 header length, JSON header (padded to 8 bytes), fixed-width records
+MAGIC = b"JFRPERF\x01"
+BINARY_EXTENSION = ".jfrperf"
+RECORD_FIELDS = [
+    ("timestamp_ns", "<i8"),
+    ("intended_start_ns", "<i8"),
+    ("response_time", "<f8"),
+    ("response_length", "<i8"),
+    ("operation", "u1"),
+    ("status", "i1"),
+    ("connect_time", "<f4"),
+    ("tls_time", "<f4"),
+    ("ttfb", "<f4"),
+    ("body_time", "<f4"),
+    ("connection_reused", "i1"),
+]
+RECORD_STRUCT = struct.Struct("<qqdqBbffffb")
+
+
+def is_binary_report(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryReportWriter:
+    """Append-only fixed-width record file that analysis.py can memory-map without parsing"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows_written = 0
+        self._file = None
+
+    def _open(self):
+        header = json.dumps({
+            "fields": RECORD_FIELDS,
+            "operations": list(OPERATIONS),
+            "statuses": list(STATUSES),
+        }).encode()
+        # Pad so records start 8-byte aligned
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 8)
+        self._file = open(self.path, 'wb')
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        logging.info(f"Streaming binary report to {self.path}")
+
+    def write_batch(self, batch):
+        """Append a metrics batch produced by MetricsRecorder.drain()"""
+        if not batch["count"]:
+            return
+        if self._file is None:
+            self._open()
+        (timestamps, operations, response_times, statuses, response_lengths, intended_starts,
+         connect_times, tls_times, ttfb_times, body_times, connections_reused) = decode_columns(batch)
+        buffer = bytearray(RECORD_STRUCT.size * batch["count"])
+        pack_into = RECORD_STRUCT.pack_into
+        rows = zip(timestamps, intended_starts, response_times, response_lengths, operations, statuses,
+                   connect_times, tls_times, ttfb_times, body_times, connections_reused)
+        for i, row in enumerate(rows):
+            pack_into(buffer, i * RECORD_STRUCT.size, *row)
+        self._file.write(buffer)
+        self._file.flush()
+        self.rows_written += batch["count"]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logging.info(f"Binary report generated: {self.path} ({self.rows_written} rows)")
+
+
+def read_binary_header(path):
+    """Return (header dict, byte offset of the first record)"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a binary performance report")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length))
+    return header, len(MAGIC) + 4 + header_length
+
+
+def open_binary_report(path):
+    """Memory-map the records of a binary report as a NumPy structured array (zero-copy)"""
+    import numpy as np
+
+    header, offset = read_binary_header(path)
+    dtype = np.dtype([tuple(field) for field in header["fields"]])
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        count = (f.tell() - offset) // dtype.itemsize
+    if not count:
+        return header, np.zeros(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
@@ -7,6 +7,86 @@ PASSWORD = os.getenv('JFROG_PASSWORD', 'PerfTest123$')
 REPO_NAME = os.getenv('JFROG_REPO_NAME', 'docker-local')
 IMAGE_NAME = os.getenv('JFROG_IMAGE_NAME', 'alpine:3.9')
 
+# Load generator behaviour: Docker pushes can be disabled for hermetic benchmarks
+# against mock_server.py, and the think time between tasks tuned (seconds)
+DOCKER_ENABLED = os.getenv('JFROG_DOCKER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# How push_docker_image uploads: "docker" pushes through the local daemon, "registry"
+# uploads blobs and the manifest directly via the Docker Registry HTTP API
+PUSH_MODE = os.getenv('PUSH_MODE', 'docker').lower()
+WAIT_TIME_MIN = float(os.getenv('WAIT_TIME_MIN', '1'))
+WAIT_TIME_MAX = float(os.getenv('WAIT_TIME_MAX', '5'))
+# Target-rate schedule: when > 0, each user starts one task every TARGET_TASK_INTERVAL
+# seconds instead of waiting WAIT_TIME_MIN..MAX, and records how far behind schedule
+# each request started so analysis.py can correct latency for coordinated omission
+TARGET_TASK_INTERVAL = float(os.getenv('TARGET_TASK_INTERVAL', '0'))
+
+# Traffic mix: relative weights of full user journeys (repo -> push -> policy -> watch
+# -> scan -> violations) versus single reads against a completed journey's resources,
+# and how long a journey waits for its image scan before asking for violations (seconds)
+JOURNEY_WEIGHT = int(os.getenv('JOURNEY_WEIGHT', '1'))
+READ_WEIGHT = int(os.getenv('READ_WEIGHT', '3'))
+JOURNEY_SCAN_WAIT = float(os.getenv('JOURNEY_SCAN_WAIT', '60'))
+
+# Worker-level resource pool: repository/policy/watch sets provisioned up front for reads,
+# the most sets kept before the least recently used is deleted, request concurrency for
+# provisioning and deletes, and whether everything created is deleted at test stop
+RESOURCE_POOL_SIZE = int(os.getenv('RESOURCE_POOL_SIZE', '10'))
+RESOURCE_POOL_MAX = int(os.getenv('RESOURCE_POOL_MAX', '50'))
+RESOURCE_POOL_CONCURRENCY = int(os.getenv('RESOURCE_POOL_CONCURRENCY', '10'))
+RESOURCE_CLEANUP = os.getenv('RESOURCE_CLEANUP', 'true').lower() in ('1', 'true', 'yes')
+
+# Locust user class: "http" (requests-based HttpUser) or "fast" (geventhttpclient-based
+# FastHttpUser, cheaper per request), plus the FastHttpUser keep-alive pool size per user
+# and its connect / network timeouts (seconds)
+USER_CLASS = os.getenv('USER_CLASS', 'http').lower()
+FASTHTTP_CONCURRENCY = int(os.getenv('FASTHTTP_CONCURRENCY', '1'))
+FASTHTTP_CONNECTION_TIMEOUT = float(os.getenv('FASTHTTP_CONNECTION_TIMEOUT', '10'))
+FASTHTTP_NETWORK_TIMEOUT = float(os.getenv('FASTHTTP_NETWORK_TIMEOUT', '60'))
+
+# Record connect / TLS / time-to-first-byte / body time and connection reuse per request
+# (requests-based clients only: USER_CLASS=http, the resource pool and the scan poller)
+PHASE_TIMING = os.getenv('PHASE_TIMING', 'false').lower() in ('1', 'true', 'yes')
+
+# Load shape: "none" uses -u/-r from the command line, "step" adds STEP_USERS users
+# (at STEP_SPAWN_RATE users/s) every STEP_DURATION seconds for STEP_COUNT steps, then stops
+LOAD_SHAPE = os.getenv('LOAD_SHAPE', 'none').lower()
+STEP_USERS = int(os.getenv('STEP_USERS', '10'))
+STEP_DURATION = float(os.getenv('STEP_DURATION', '120'))
+STEP_COUNT = int(os.getenv('STEP_COUNT', '10'))
+STEP_SPAWN_RATE = float(os.getenv('STEP_SPAWN_RATE', '10'))
+
+# Xray scan-status polling (seconds): first poll delay / backoff base, backoff cap,
+# give-up timeout, and maximum concurrent status checks per worker
+SCAN_POLL_INITIAL_DELAY = float(os.getenv('SCAN_POLL_INITIAL_DELAY', '2'))
+SCAN_POLL_MAX_DELAY = float(os.getenv('SCAN_POLL_MAX_DELAY', '30'))
+SCAN_POLL_TIMEOUT = float(os.getenv('SCAN_POLL_TIMEOUT', '600'))
+SCAN_POLL_CONCURRENCY = int(os.getenv('SCAN_POLL_CONCURRENCY', '10'))
+
+# Metrics streaming: workers flush buffered samples to the master every interval,
+# split into batches of at most METRICS_BATCH_SIZE rows per message
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '2'))
+METRICS_BATCH_SIZE = int(os.getenv('METRICS_BATCH_SIZE', '5000'))
+# Seconds the master waits at test stop for every worker's final batch (teardown deletes included)
+METRICS_FINAL_TIMEOUT = float(os.getenv('METRICS_FINAL_TIMEOUT', '60'))
+
+# Report format written by the master: "csv", "binary" (memory-mappable records) or "both"
+REPORT_FORMAT = os.getenv('REPORT_FORMAT', 'csv').lower()
+
+# Load-generator health: how often each worker reports CPU / greenlets / loop lag, how
+# often the loop-lag probe wakes up (seconds), and when a worker counts as saturated
+HEALTH_SAMPLE_INTERVAL = float(os.getenv('HEALTH_SAMPLE_INTERVAL', '5'))
+HEALTH_LAG_PROBE_INTERVAL = float(os.getenv('HEALTH_LAG_PROBE_INTERVAL', '0.1'))
+HEALTH_CPU_WARN_PERCENT = float(os.getenv('HEALTH_CPU_WARN_PERCENT', '90'))
+HEALTH_LAG_WARN_MS = float(os.getenv('HEALTH_LAG_WARN_MS', '50'))
+
+# launcher.py: worker processes (0 = one per available core), whether to pin each to its
+# own core, master address, and how many times a crashed worker is restarted
+LAUNCHER_WORKERS = int(os.getenv('LAUNCHER_WORKERS', '0'))
+LAUNCHER_PIN_CPUS = os.getenv('LAUNCHER_PIN_CPUS', 'false').lower() in ('1', 'true', 'yes')
+LOCUST_MASTER_HOST = os.getenv('LOCUST_MASTER_HOST', '127.0.0.1')
+LOCUST_MASTER_PORT = int(os.getenv('LOCUST_MASTER_PORT', '5557'))
+LAUNCHER_MAX_RESTARTS = int(os.getenv('LAUNCHER_MAX_RESTARTS', '5'))
+
 # Optional: Add validation
 def validate_config():
     """Validate that all required configuration is present"""
@@ -22,6 +102,24 @@ def validate_config():
     
     if missing_vars:
         raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
+
+    if REPORT_FORMAT not in ('csv', 'binary', 'both'):
+        raise ValueError(f"REPORT_FORMAT must be csv, binary or both (got {REPORT_FORMAT})")
+
+    if PUSH_MODE not in ('docker', 'registry'):
+        raise ValueError(f"PUSH_MODE must be docker or registry (got {PUSH_MODE})")
+
+    if USER_CLASS not in ('http', 'fast'):
+        raise ValueError(f"USER_CLASS must be http or fast (got {USER_CLASS})")
+
+    if LOAD_SHAPE not in ('none', 'step'):
+        raise ValueError(f"LOAD_SHAPE must be none or step (got {LOAD_SHAPE})")
+
+    if METRICS_FINAL_TIMEOUT < 0:
+        raise ValueError(f"METRICS_FINAL_TIMEOUT must be >= 0 (got {METRICS_FINAL_TIMEOUT})")
+
+    if JOURNEY_WEIGHT < 1 or READ_WEIGHT < 0:
+        raise ValueError(f"JOURNEY_WEIGHT must be >= 1 and READ_WEIGHT >= 0 (got {JOURNEY_WEIGHT}, {READ_WEIGHT})")
     
     return True
 
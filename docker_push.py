@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import tarfile
+import time
+import docker
+from gevent.lock import Semaphore
+from config import JFROG_URL, USERNAME, PASSWORD, IMAGE_NAME
+from jfrog_api import IMAGE_REPOSITORY, IMAGE_TAG, ARTIFACT_PATH
+
+MANIFEST_MEDIA_TYPE = "application/vnd.docker.distribution.manifest.v2+json"
+CONFIG_MEDIA_TYPE = "application/vnd.docker.container.image.v1+json"
+LAYER_MEDIA_TYPE = "application/vnd.docker.image.rootfs.diff.tar.gzip"
+
+REGISTRY_HOST = JFROG_URL.replace("https://", "").replace("http://", "")
+
+# Statuses that mark a layer as done in `docker push` progress events
+LAYER_DONE_STATUSES = ("Pushed", "Layer already exists", "Mounted from")
+
+# Worker-wide state: one logged-in Docker client, one pulled image, one set of prepared blobs
+_lock = Semaphore()
+_docker_client = None
+_base_image = None
+_registry_image = None
+
+
+def get_docker_client():
+    """Shared, logged-in Docker client (its connection pool is reused by every user)"""
+    global _docker_client
+    with _lock:
+        if _docker_client is None:
+            client = docker.from_env(max_pool_size=64)
+            client.login(username=USERNAME, password=PASSWORD, registry=REGISTRY_HOST)
+            _docker_client = client
+        return _docker_client
+
+
+def get_base_image():
+    """Pull IMAGE_NAME once per worker instead of on every push"""
+    global _base_image
+    client = get_docker_client()
+    with _lock:
+        if _base_image is None:
+            logging.info(f"Pulling image once for this worker: {IMAGE_NAME}")
+            _base_image = client.images.pull(IMAGE_NAME)
+        return _base_image
+
+
+class RegistryImage:
+    """Blobs and schema 2 manifest of IMAGE_NAME, prepared once for direct registry uploads"""
+
+    def __init__(self, config_blob, layer_blobs):
+        self.config = self._descriptor(CONFIG_MEDIA_TYPE, config_blob)
+        self.layers = [self._descriptor(LAYER_MEDIA_TYPE, blob) for blob in layer_blobs]
+        self.blobs = {d["digest"]: blob for d, blob in zip([self.config] + self.layers, [config_blob] + layer_blobs)}
+        self.manifest = json.dumps({
+            "schemaVersion": 2,
+            "mediaType": MANIFEST_MEDIA_TYPE,
+            "config": self.config,
+            "layers": self.layers,
+        }).encode()
+
+    @staticmethod
+    def _descriptor(media_type, blob):
+        return {"mediaType": media_type, "size": len(blob), "digest": f"sha256:{hashlib.sha256(blob).hexdigest()}"}
+
+    @classmethod
+    def from_docker_archive(cls, archive):
+        """Build from `docker save` output; layers are gzipped deterministically so digests are stable"""
+        with tarfile.open(fileobj=archive) as tar:
+            (entry,) = json.load(tar.extractfile("manifest.json"))
+            config_blob = tar.extractfile(entry["Config"]).read()
+            layer_blobs = [
+                gzip.compress(tar.extractfile(layer).read(), compresslevel=6, mtime=0)
+                for layer in entry["Layers"]
+            ]
+        return cls(config_blob, layer_blobs)
+
+
+def get_registry_image():
+    """Export and prepare the image blobs once per worker"""
+    global _registry_image
+    image = get_base_image()
+    with _lock:
+        if _registry_image is None:
+            archive = io.BytesIO()
+            for chunk in image.save(named=True):
+                archive.write(chunk)
+            archive.seek(0)
+            _registry_image = RegistryImage.from_docker_archive(archive)
+            logging.info(f"Prepared {len(_registry_image.layers)} layer(s) of {IMAGE_NAME} for registry uploads")
+        return _registry_image
+
+
+class PushProgress:
+    """Timing and byte counts derived from streamed `docker push` progress events"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_event = None
+        self.finished = None
+        self.layers = {}
+        self.errors = []
+
+    def feed(self, event):
+        now = time.perf_counter()
+        if self.first_event is None:
+            self.first_event = now
+        if 'error' in event:
+            self.errors.append(event['error'])
+            return
+        layer_id = event.get('id')
+        status = event.get('status', '')
+        if not layer_id or 'progressDetail' not in event:
+            return
+        layer = self.layers.setdefault(layer_id, {"started": now, "pushing": False, "finished": None, "bytes": 0})
+        detail = event['progressDetail'] or {}
+        if status == "Pushing":
+            if not layer["pushing"]:
+                # Upload time starts with the first byte pushed, not with Preparing/Waiting
+                layer["started"] = now
+                layer["pushing"] = True
+            layer["bytes"] = max(layer["bytes"], detail.get('current', 0))
+        elif status.startswith(LAYER_DONE_STATUSES):
+            layer["finished"] = now
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def total_ms(self):
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+    @property
+    def ttfb_ms(self):
+        return (self.first_event - self.started) * 1000 if self.first_event is not None else None
+
+    @property
+    def bytes_transferred(self):
+        return sum(layer["bytes"] for layer in self.layers.values())
+
+    @property
+    def mb_per_second(self):
+        return self.bytes_transferred / (1024 * 1024) / (self.total_ms / 1000) if self.total_ms else 0.0
+
+    def completed_layers(self):
+        """(duration ms, bytes uploaded) for each layer that finished; 0 bytes means it already existed"""
+        return [
+            ((layer["finished"] - layer["started"]) * 1000, layer["bytes"])
+            for layer in self.layers.values() if layer["finished"] is not None
+        ]
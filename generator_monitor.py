@@ -0,0 +1,129 @@
+import logging
+import os
+import sys
+import time
+import gevent
+from config import HEALTH_SAMPLE_INTERVAL, HEALTH_LAG_PROBE_INTERVAL, HEALTH_CPU_WARN_PERCENT, HEALTH_LAG_WARN_MS
+
+
+def process_cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+def process_rss_mb():
+    """Resident set size in MiB (peak RSS where /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def open_socket_count():
+    """Sockets held open by this process (-1 where /proc is not available)"""
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return -1
+    count = 0
+    for fd in fds:
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                count += 1
+        except OSError:
+            pass  # Closed between listdir and readlink
+    return count
+
+
+class GeneratorMonitor:
+    """Per-worker probe telling whether the load generator itself is the bottleneck
+
+    A background greenlet wakes every HEALTH_LAG_PROBE_INTERVAL seconds and measures
+    how late it woke up (gevent loop lag: time other greenlets held the loop). Every
+    HEALTH_SAMPLE_INTERVAL seconds it reports process CPU %, running user greenlets,
+    the mean / max loop lag of the interval, RSS and open sockets to `on_sample`.
+    """
+
+    def __init__(self, environment, on_sample):
+        self.environment = environment
+        self.on_sample = on_sample
+        self.latest = None
+        self._greenlet = None
+
+    def start(self):
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+
+    def _user_greenlets(self):
+        runner = self.environment.runner
+        return len(runner.user_greenlets) if runner is not None else 0
+
+    def _run(self):
+        last_time = time.monotonic()
+        last_cpu = process_cpu_seconds()
+        lags = []
+        while True:
+            expected = time.monotonic() + HEALTH_LAG_PROBE_INTERVAL
+            gevent.sleep(HEALTH_LAG_PROBE_INTERVAL)
+            now = time.monotonic()
+            lags.append(max(0.0, now - expected) * 1000)
+            if now - last_time < HEALTH_SAMPLE_INTERVAL:
+                continue
+            cpu = process_cpu_seconds()
+            self.latest = {
+                "timestamp": time.time(),
+                "cpu_percent": (cpu - last_cpu) / (now - last_time) * 100,
+                "greenlets": self._user_greenlets(),
+                "loop_lag_ms": sum(lags) / len(lags),
+                "loop_lag_max_ms": max(lags),
+                "rss_mb": process_rss_mb(),
+                "open_sockets": open_socket_count(),
+            }
+            last_time, last_cpu, lags = now, cpu, []
+            try:
+                self.on_sample(self.latest)
+            except Exception as e:
+                logging.error(f"Failed to report generator health: {str(e)}")
+
+
+def is_saturated(sample):
+    return sample["cpu_percent"] >= HEALTH_CPU_WARN_PERCENT or sample["loop_lag_ms"] >= HEALTH_LAG_WARN_MS
+
+
+class GeneratorHealth:
+    """Master-side view of every worker's latest health sample, fed from the metrics stream"""
+
+    def __init__(self):
+        self.workers = {}
+        self.saturated_samples = 0
+
+    def clear(self):
+        self.workers.clear()
+        self.saturated_samples = 0
+
+    def record(self, worker_id, sample):
+        self.workers[worker_id] = sample
+        if is_saturated(sample):
+            self.saturated_samples += 1
+            logging.warning(
+                f"Load generator saturated on worker {worker_id}: CPU {sample['cpu_percent']:.0f}%, "
+                f"loop lag {sample['loop_lag_ms']:.1f} ms (max {sample['loop_lag_max_ms']:.1f} ms), "
+                f"{sample['greenlets']} users - latencies from this worker include client-side delay"
+            )
+
+    def log_summary(self):
+        for worker_id, sample in sorted(self.workers.items(), key=lambda item: str(item[0])):
+            logging.info(f"Worker {worker_id}: CPU {sample['cpu_percent']:.0f}%, {sample['greenlets']} users, "
+                         f"loop lag {sample['loop_lag_ms']:.1f} ms (max {sample['loop_lag_max_ms']:.1f} ms), "
+                         f"RSS {sample['rss_mb']:.0f} MiB, {sample['open_sockets']} sockets")
+        if self.saturated_samples:
+            logging.warning(f"{self.saturated_samples} health sample(s) showed a saturated load generator; "
+                            f"add workers before trusting the latency numbers")
@@ -0,0 +1,163 @@
+import itertools
+import logging
+import uuid
+import payloads
+from config import REPO_NAME, IMAGE_NAME
+from payloads import AUTH_HEADER, JSON_HEADERS
+
+# Artifactory/Xray requests shared by the users and the worker-level resource pool.
+# Each call takes a Locust HttpSession and a MetricsBuffer, records one sample and
+# returns whether it succeeded. Bodies come from the precomputed templates in payloads.py.
+
+IMAGE_REPOSITORY, _, IMAGE_TAG = IMAGE_NAME.partition(':')
+IMAGE_TAG = IMAGE_TAG or "latest"
+# Path of the pushed image's manifest inside the repository, as Xray indexes it
+ARTIFACT_PATH = f"{IMAGE_REPOSITORY}/{IMAGE_TAG}/manifest.json"
+
+# Status codes that count as success per operation (shared with async_driver.py)
+SUCCESS_STATUSES = {
+    "create_repository": (200,),
+    "create_policy": (201,),
+    "create_watch": (200, 201),
+    "check_scan_status": (200,),
+    "get_violations": (200,),
+    # 404 counts as deleted
+    "delete_watch": (200, 204, 404),
+    "delete_policy": (200, 204, 404),
+    "delete_repository": (200, 204, 404),
+}
+
+# Unique per worker process, so names never collide across users, workers or runs
+_run_id = uuid.uuid4().hex[:8]
+_sequence = itertools.count(1)
+
+
+def unique_name(prefix):
+    return f"{prefix}-{_run_id}-{next(_sequence)}"
+
+
+def new_repo_key():
+    return unique_name(REPO_NAME)
+
+
+def new_policy_name():
+    return unique_name("sec_policy")
+
+
+def new_watch_name():
+    return unique_name("watch")
+
+
+def create_repository(client, metrics, repo_key):
+    """Create a Docker repository indexed by Xray"""
+    with client.put(
+        f"/artifactory/api/repositories/{repo_key}",
+        data=payloads.REPOSITORY.render(repo_key=repo_key),
+        headers=JSON_HEADERS,
+        name="/artifactory/api/repositories/[key]",
+        catch_response=True
+    ) as response:
+        success = response.status_code in SUCCESS_STATUSES["create_repository"]
+        if success:
+            response.success()
+        else:
+            response.failure(f"Failed to create repository: {response.text}")
+        metrics.record("create_repository", response.request_meta["response_time"], success)
+        return success
+
+
+def create_policy(client, metrics, policy_name):
+    """Create security policy"""
+    with client.post(
+        "/xray/api/v2/policies",
+        data=payloads.POLICY.render(policy_name=policy_name),
+        headers=JSON_HEADERS,
+        catch_response=True
+    ) as response:
+        success = response.status_code in SUCCESS_STATUSES["create_policy"]
+        if success:
+            response.success()
+            logging.debug(f"Policy created: {policy_name}")
+        else:
+            response.failure(f"Failed to create policy: {response.text}")
+            logging.error(f"Policy creation failed: {response.text}")
+        metrics.record("create_policy", response.request_meta["response_time"], success)
+        return success
+
+
+def create_watch(client, metrics, watch_name, repo_key, policy_name):
+    """Create watch assigning the policy to the repository"""
+    with client.post(
+        "/xray/api/v2/watches",
+        data=payloads.WATCH.render(watch_name=watch_name, repo_key=repo_key, policy_name=policy_name),
+        headers=JSON_HEADERS,
+        catch_response=True
+    ) as response:
+        success = response.status_code in SUCCESS_STATUSES["create_watch"]
+        if success:
+            response.success()
+            logging.debug(f"Watch {watch_name} created successfully")
+        else:
+            response.failure(f"Failed to create watch: {response.text}")
+        metrics.record("create_watch", response.request_meta["response_time"], success)
+        return success
+
+
+def check_scan_status(client, metrics, repo_key, path):
+    """Read the Xray scan status of an artifact"""
+    with client.post(
+        "/xray/api/v1/artifact/status",
+        data=payloads.ARTIFACT_STATUS.render(repo_key=repo_key, path=path),
+        headers=JSON_HEADERS,
+        catch_response=True
+    ) as response:
+        success = response.status_code in SUCCESS_STATUSES["check_scan_status"]
+        if success:
+            response.success()
+        else:
+            response.failure(f"Scan status check failed: {response.text}")
+        metrics.record("check_scan_status", response.request_meta["response_time"], success)
+        return success
+
+
+def get_violations(client, metrics, watch_name, repo_key, path):
+    """Get security violations of an artifact under a watch"""
+    with client.post(
+        "/xray/api/v1/violations",
+        data=payloads.VIOLATIONS.render(watch_name=watch_name, repo_key=repo_key, path=path),
+        headers=JSON_HEADERS,
+        catch_response=True
+    ) as response:
+        success = response.status_code in SUCCESS_STATUSES["get_violations"]
+        if success:
+            response.success()
+        else:
+            response.failure(f"Failed to get violations: {response.text}")
+        metrics.record("get_violations", response.request_meta["response_time"], success)
+        return success
+
+
+# (operation, URL template) for deletes
+DELETE_ENDPOINTS = {
+    "watch": ("delete_watch", "/xray/api/v2/watches/{}"),
+    "policy": ("delete_policy", "/xray/api/v2/policies/{}"),
+    "repository": ("delete_repository", "/artifactory/api/repositories/{}"),
+}
+
+
+def delete_resource(client, metrics, kind, name):
+    """Delete a watch, policy or repository by name"""
+    operation, url = DELETE_ENDPOINTS[kind]
+    with client.delete(
+        url.format(name),
+        headers=AUTH_HEADER,
+        name=url.format("[name]"),
+        catch_response=True
+    ) as response:
+        success = response.status_code in SUCCESS_STATUSES[operation]
+        if success:
+            response.success()
+        else:
+            response.failure(f"Failed to delete {kind} {name}: {response.text}")
+        metrics.record(operation, response.request_meta["response_time"], success)
+        return success
@@ -0,0 +1,169 @@
+import math
+import sys
+from array import array
+
+# Percentiles reported for every operation
+REPORTED_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with fixed memory (HdrHistogram-style)
+
+    Latencies are recorded in milliseconds and stored as integer microseconds,
+    keeping `significant_figures` of precision across the whole trackable range.
+    """
+
+    def __init__(self, significant_figures=2, highest_trackable_ms=3_600_000):
+        self.significant_figures = significant_figures
+        self.highest_trackable_ms = highest_trackable_ms
+        highest = int(highest_trackable_ms * 1000)
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        sub_bucket_count_magnitude = math.ceil(math.log2(largest_single_unit))
+        self._sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self._sub_bucket_count = 1 << (self._sub_bucket_half_count_magnitude + 1)
+        self._sub_bucket_half_count = self._sub_bucket_count >> 1
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+
+        smallest_untrackable = self._sub_bucket_count
+        bucket_count = 1
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._highest = highest
+        self.counts = array('Q', [0]) * ((bucket_count + 1) * self._sub_bucket_half_count)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.total_count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def _index_for(self, value):
+        bucket_index = (value | self._sub_bucket_mask).bit_length() - (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket_index - self._sub_bucket_half_count
+
+    def _highest_equivalent_value(self, index):
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        return ((sub_bucket_index + 1) << bucket_index) - 1
+
+    def record(self, value_ms, count=1):
+        """Record a latency in ms; values beyond the trackable range are clamped"""
+        value = min(max(int(value_ms * 1000), 0), self._highest)
+        self.counts[self._index_for(value)] += count
+        self.total_count += count
+        self.total_ms += value_ms * count
+        if value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_values(self, values_ms):
+        """Vectorised bulk record of a NumPy array of latencies in ms (NaN values are skipped)"""
+        import numpy as np
+
+        values_ms = np.asarray(values_ms, dtype='float64')
+        values_ms = values_ms[~np.isnan(values_ms)]
+        if not len(values_ms):
+            return
+        values = np.clip((values_ms * 1000).astype('int64'), 0, self._highest)
+        masked = values | self._sub_bucket_mask
+        # bit_length for positive int64 values, computed without a Python loop
+        bit_length = np.floor(np.log2(masked.astype('float64'))).astype('int64') + 1
+        bucket_index = bit_length - (self._sub_bucket_half_count_magnitude + 1)
+        sub_bucket_index = values >> bucket_index
+        indices = ((bucket_index + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket_index - self._sub_bucket_half_count
+        bincounts = np.bincount(indices, minlength=len(self.counts))
+        for index in np.flatnonzero(bincounts):
+            self.counts[int(index)] += int(bincounts[index])
+        self.total_count += len(values_ms)
+        self.total_ms += float(values_ms.sum())
+        self.min_ms = min(self.min_ms, float(values_ms.min()))
+        self.max_ms = max(self.max_ms, float(values_ms.max()))
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.total_count if self.total_count else math.nan
+
+    def percentile(self, percentile):
+        """Latency in ms at the given percentile (0-100), or NaN when empty"""
+        if not self.total_count:
+            return math.nan
+        target = max(1, math.ceil(percentile / 100.0 * self.total_count))
+        running = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            running += count
+            if running >= target:
+                return min(self._highest_equivalent_value(index) / 1000.0, self.max_ms)
+        return self.max_ms
+
+    def percentiles(self, percentiles=REPORTED_PERCENTILES):
+        return {p: self.percentile(p) for p in percentiles}
+
+    def merge(self, other):
+        """Add another histogram with the same layout into this one"""
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Cannot merge histograms with different precision or range")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def to_snapshot(self):
+        """Compact, message-friendly snapshot: only non-empty counters are encoded"""
+        indices = array('I')
+        counts = array('Q')
+        for index, count in enumerate(self.counts):
+            if count:
+                indices.append(index)
+                counts.append(count)
+        return {
+            "significant_figures": self.significant_figures,
+            "highest_trackable_ms": self.highest_trackable_ms,
+            "byteorder": sys.byteorder,
+            "total_count": self.total_count,
+            "total_ms": self.total_ms,
+            "min_ms": self.min_ms if self.total_count else None,
+            "max_ms": self.max_ms,
+            "indices": indices.tobytes(),
+            "counts": counts.tobytes(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        histogram = cls(snapshot["significant_figures"], snapshot["highest_trackable_ms"])
+        histogram.merge_snapshot(snapshot)
+        return histogram
+
+    def merge_snapshot(self, snapshot):
+        """Merge a snapshot produced by to_snapshot() without materialising another histogram"""
+        if (snapshot["significant_figures"], snapshot["highest_trackable_ms"]) != (
+                self.significant_figures, self.highest_trackable_ms):
+            raise ValueError("Cannot merge histograms with different precision or range")
+        indices = array('I')
+        indices.frombytes(snapshot["indices"])
+        counts = array('Q')
+        counts.frombytes(snapshot["counts"])
+        if snapshot["byteorder"] != sys.byteorder:
+            indices.byteswap()
+            counts.byteswap()
+        for index, count in zip(indices, counts):
+            self.counts[index] += count
+        self.total_count += snapshot["total_count"]
+        self.total_ms += snapshot["total_ms"]
+        if snapshot["min_ms"] is not None:
+            self.min_ms = min(self.min_ms, snapshot["min_ms"])
+        self.max_ms = max(self.max_ms, snapshot["max_ms"])
@@ -0,0 +1,170 @@
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from config import (
+    LAUNCHER_WORKERS, LAUNCHER_PIN_CPUS, LOCUST_MASTER_HOST, LOCUST_MASTER_PORT, LAUNCHER_MAX_RESTARTS
+)
+
+logging.basicConfig(level=logging.INFO)
+
+# One Locust master plus one worker process per core: gevent runs every user of a
+# worker on a single thread, so one worker can never use more than one core.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOCUSTFILE = os.path.join(ROOT, "locustfile.py")
+
+
+def available_cores():
+    """Cores this process may run on (respects cgroup/taskset limits where supported)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class WorkerProcess:
+    """A supervised Locust worker, optionally pinned to one core"""
+
+    def __init__(self, index, core, args):
+        self.index = index
+        self.core = core
+        self.args = args
+        self.process = None
+        self.restarts = 0
+        self.restart_at = None
+
+    def start(self):
+        self.process = subprocess.Popen([
+            sys.executable, "-m", "locust", "-f", LOCUSTFILE, "--worker",
+            "--master-host", self.args.master_host, "--master-port", str(self.args.master_port)
+        ])
+        self.restart_at = None
+        if self.core is not None:
+            try:
+                os.sched_setaffinity(self.process.pid, {self.core})
+            except OSError as e:
+                logging.warning(f"Could not pin worker {self.index} to core {self.core}: {str(e)}")
+        logging.info(f"Started worker {self.index} (pid {self.process.pid}"
+                     f"{f', core {self.core}' if self.core is not None else ''})")
+
+    def poll(self):
+        """Restart the worker if it crashed, with exponential backoff; False once it is done for good"""
+        if self.restart_at is not None:
+            if time.monotonic() >= self.restart_at:
+                self.start()
+            return True
+        code = self.process.poll()
+        if code is None:
+            return True
+        if code == 0:
+            logging.info(f"Worker {self.index} exited")
+            return False
+        if self.restarts >= self.args.max_restarts:
+            logging.error(f"Worker {self.index} exited with {code}, giving up after {self.restarts} restart(s)")
+            return False
+        delay = min(30, 2 ** self.restarts)
+        self.restarts += 1
+        self.restart_at = time.monotonic() + delay
+        logging.warning(f"Worker {self.index} exited with {code}, restarting in {delay}s "
+                        f"({self.restarts}/{self.args.max_restarts})")
+        return True
+
+    def terminate(self):
+        self.restart_at = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def wait(self, timeout):
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def start_master(args, workers, extra_args):
+    return subprocess.Popen([
+        sys.executable, "-m", "locust", "-f", LOCUSTFILE, "--master",
+        "--master-bind-port", str(args.master_port), "--expect-workers", str(workers), *extra_args
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Launch a Locust master and one supervised worker per core",
+        epilog="Arguments after -- are passed to the master, e.g. -- --headless -u 500 -r 50 -t 10m"
+    )
+    parser.add_argument("--workers", type=int, default=LAUNCHER_WORKERS,
+                        help="Worker processes (default: one per available core)")
+    parser.add_argument("--pin", action="store_true", default=LAUNCHER_PIN_CPUS,
+                        help="Pin each worker to its own core with CPU affinity")
+    parser.add_argument("--master-host", default=LOCUST_MASTER_HOST)
+    parser.add_argument("--master-port", type=int, default=LOCUST_MASTER_PORT)
+    parser.add_argument("--no-master", action="store_true",
+                        help="Only start workers, connecting to a master on another machine")
+    parser.add_argument("--max-restarts", type=int, default=LAUNCHER_MAX_RESTARTS,
+                        help="Restarts per crashed worker before giving up")
+    argv = sys.argv[1:]
+    extra_args = []
+    if "--" in argv:
+        extra_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    cores = available_cores()
+    count = args.workers or len(cores)
+    if args.pin and not hasattr(os, "sched_setaffinity"):
+        logging.warning("CPU pinning is not supported on this platform, workers will not be pinned")
+        args.pin = False
+    if args.pin and count > len(cores):
+        logging.warning(f"{count} workers on {len(cores)} core(s): some cores run more than one worker")
+
+    master = None if args.no_master else start_master(args, count, extra_args)
+    workers = [WorkerProcess(i, cores[i % len(cores)] if args.pin else None, args) for i in range(count)]
+    for worker in workers:
+        worker.start()
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    running = list(workers)
+    try:
+        while True:
+            time.sleep(1)
+            running = [worker for worker in running if worker.poll()]
+            # With a master, the run ends when the master exits: workers quit first while it is still
+            # collecting their final metrics and writing the report
+            if master is not None and master.poll() is not None:
+                logging.info(f"Master exited with {master.returncode}")
+                break
+            if master is None and not running:
+                logging.info("All workers exited")
+                break
+    except KeyboardInterrupt:
+        logging.info("Stopping master and workers")
+    finally:
+        # Master first, so it can collect the workers' last metrics before they go away
+        if master is not None and master.poll() is None:
+            master.send_signal(signal.SIGINT)
+            try:
+                master.wait(30)
+            except subprocess.TimeoutExpired:
+                master.kill()
+                master.wait()
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait(10)
+    if master is not None:
+        sys.exit(master.returncode)
+    sys.exit(0 if all(worker.process.returncode == 0 for worker in workers) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,32 @@
-import json
 import time
 import logging
-from locust import HttpUser, task, between, events
-from locust.runners import MasterRunner, WorkerRunner
+from locust import HttpUser, FastHttpUser, TaskSet, SequentialTaskSet, LoadTestShape, task, between, events
+from locust.runners import MasterRunner, WorkerRunner, STATE_MISSING
 import docker
-import base64
+import gevent
 from datetime import datetime
-import csv
-import os
 import sys
-import threading
-import logging
 import signal
-from config import JFROG_URL, USERNAME, PASSWORD, REPO_NAME, IMAGE_NAME, print_config
+from config import (
+    JFROG_URL, METRICS_FLUSH_INTERVAL, METRICS_BATCH_SIZE, METRICS_FINAL_TIMEOUT,
+    REPORT_FORMAT, DOCKER_ENABLED, PUSH_MODE, WAIT_TIME_MIN, WAIT_TIME_MAX, TARGET_TASK_INTERVAL, JOURNEY_WEIGHT, READ_WEIGHT,
+    JOURNEY_SCAN_WAIT, USER_CLASS, FASTHTTP_CONCURRENCY, FASTHTTP_CONNECTION_TIMEOUT, FASTHTTP_NETWORK_TIMEOUT,
+    LOAD_SHAPE, STEP_USERS, STEP_DURATION, STEP_COUNT, STEP_SPAWN_RATE, PHASE_TIMING
+)
+from latency_histogram import LatencyHistogram
+from metrics_recorder import MetricsRecorder
+from binary_report import BinaryReportWriter, BINARY_EXTENSION
+from docker_push import (
+    REGISTRY_HOST, IMAGE_REPOSITORY, IMAGE_TAG, ARTIFACT_PATH, MANIFEST_MEDIA_TYPE, PushProgress, get_docker_client,
+    get_base_image, get_registry_image
+)
+from report_writer import CsvReportWriter, write_percentiles, HEALTH_FIELDS, health_report_path
+from scan_poller import ScanStatusPoller
+from resource_pool import ResourcePool
+from generator_monitor import GeneratorMonitor, GeneratorHealth
+import jfrog_api
+import phase_timing
+from payloads import AUTH_HEADER
 
 
 # Configure logging
@@ -23,81 +37,366 @@ def signal_handler(sig, frame):
     logging.debug("Signal received, shutting down")
     if hasattr(sys, 'locust_environment') and sys.locust_environment.runner:
         logging.info("Stopping Locust runner to trigger on_stop for all users")
-        sys.locust_environment.runner.quit()
+        # quit() blocks (final metrics, teardown), which is not allowed in the signal callback itself;
+        # Locust shuts down once the runner greenlet has been killed
+        gevent.spawn(sys.locust_environment.runner.quit)
+        return
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
-# Metrics storage
-metrics_data = []
+# Metrics storage: per-user columnar buffers, streamed to the master in batches
+metrics_recorder = MetricsRecorder(phase_timing.install() if PHASE_TIMING else None)
+if PHASE_TIMING and USER_CLASS == 'fast':
+    logging.warning("PHASE_TIMING only instruments requests/urllib3: FastHttpUser samples will have no phases")
+report_prefix = None
+report_writers = []
+metrics_flusher = None
+scan_poller = None
+resource_pool = None
+generator_monitor = None
+# Health samples waiting for the next metrics flush (worker side)
+pending_health = []
+# Latest health sample of every load generator and the sidecar they are written to (master or local runner)
+generator_health = GeneratorHealth()
+health_writer = None
+# Registry upload headers, built once and shared by every user
+MANIFEST_HEADERS = {**AUTH_HEADER, "Content-Type": MANIFEST_MEDIA_TYPE}
+BLOB_HEADERS = {**AUTH_HEADER, "Content-Type": "application/octet-stream"}
+# Per-operation latency histograms merged from all workers (master or local runner)
+latency_histograms = {}
+# Workers (client ids) whose final metrics batch of the current test has arrived (master)
+final_batches = set()
+# Whether histograms were merged after the percentiles were written (a batch later than the timeout)
+percentiles_stale = False
+
+def merge_histograms(snapshots):
+    global percentiles_stale
+    percentiles_stale = percentiles_stale or bool(snapshots)
+    for operation, snapshot in snapshots.items():
+        if operation not in latency_histograms:
+            latency_histograms[operation] = LatencyHistogram.from_snapshot(snapshot)
+        else:
+            latency_histograms[operation].merge_snapshot(snapshot)
+
+def flush_metrics(environment, final=False):
+    """Ship buffered metrics in bounded batches to the master (or the local report)
+
+    A worker's `final` flush always sends at least one message and flags the last
+    one, so the master knows this worker has nothing more to report.
+    """
+    histograms = metrics_recorder.take_histograms()
+    health = pending_health[:]
+    pending_health.clear()
+    if isinstance(environment.runner, WorkerRunner):
+        def send(batch, last=False):
+            nonlocal histograms, health
+            environment.runner.send_message("metrics_report", {
+                "worker_id": environment.runner.worker_index,
+                "metrics": batch,
+                "histograms": histograms,
+                "health": health,
+                "final": last
+            })
+            histograms, health = {}, []  # Deltas and health samples travel with the first batch only
+
+        pending = None
+        for batch in metrics_recorder.drain(METRICS_BATCH_SIZE):
+            if pending is not None:
+                send(pending)
+            pending = batch
+        if pending is not None or histograms or health or final:
+            send(pending, final)
+        return
+    merge_histograms(histograms)
+    for sample in health:
+        record_health("local", sample)
+    for batch in metrics_recorder.drain(METRICS_BATCH_SIZE):
+        write_batch(batch)
+
+def write_batch(batch):
+    for writer in report_writers:
+        writer.write_batch(batch)
+
+def metrics_flush_loop(environment):
+    """Periodically flush metrics so memory stays flat regardless of run length"""
+    while True:
+        gevent.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            flush_metrics(environment)
+        except Exception as e:
+            logging.error(f"Failed to flush metrics: {str(e)}")
 
 @events.init.add_listener
 def on_locust_init(environment, **kwargs):
     if isinstance(environment.runner, MasterRunner):
         logging.info("Master node initialized")
-        if not hasattr(sys, "master_reports"):
-            sys.master_reports = {}
         environment.runner.register_message("metrics_report", handle_metrics_report)
     elif isinstance(environment.runner, WorkerRunner):
         logging.info("Worker node initialized")
     else:
         logging.info("Local runner initialized")
-    sys.locust_environment = environment  # Store environment for signal handler   
+    sys.locust_environment = environment  # Store environment for signal handler
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    """Open the streaming report on the master and start the flusher on load generators"""
+    global report_prefix, metrics_flusher, scan_poller, resource_pool, generator_monitor, health_writer
+    if not isinstance(environment.runner, WorkerRunner):
+        close_reports()
+        latency_histograms.clear()
+        final_batches.clear()
+        generator_health.clear()
+        start_time = datetime.now()
+        report_prefix = f"performance_report_{start_time.strftime('%Y%m%d_%H%M%S')}"
+        if REPORT_FORMAT in ('csv', 'both'):
+            report_writers.append(CsvReportWriter(f"{report_prefix}.csv"))
+        if REPORT_FORMAT in ('binary', 'both'):
+            report_writers.append(BinaryReportWriter(f"{report_prefix}{BINARY_EXTENSION}"))
+        health_writer = CsvReportWriter(health_report_path(report_prefix), HEALTH_FIELDS)
+    if not isinstance(environment.runner, MasterRunner) and metrics_flusher is None:
+        metrics_flusher = gevent.spawn(metrics_flush_loop, environment)
+        scan_poller = ScanStatusPoller(environment, metrics_recorder)
+        scan_poller.start()
+        resource_pool = ResourcePool(environment, metrics_recorder)
+        resource_pool.start()
+        generator_monitor = GeneratorMonitor(environment, pending_health.append)
+        generator_monitor.start()
+
 @events.test_stop.add_listener
 def on_test_stop(environment, **kwargs):
-    """Generate unified report at test completion"""
+    """Flush remaining metrics and summarise latency percentiles from the merged histograms
+
+    The master first waits for every worker's final batch (see wait_for_final_batches),
+    so the percentiles cover the whole run. The report itself stays open until quit in
+    case a batch still arrives after the timeout.
+    """
+    global metrics_flusher, scan_poller, resource_pool, generator_monitor
+    if generator_monitor is not None:
+        generator_monitor.stop()
+        generator_monitor = None
+    if metrics_flusher is not None:
+        metrics_flusher.kill()
+        metrics_flusher = None
+    if scan_poller is not None:
+        scan_poller.stop()
+        scan_poller = None
+    if resource_pool is not None:
+        # Delete everything this worker created before the final flush, so the deletes are reported too
+        # (the master waits for that flush, see wait_for_final_batches)
+        resource_pool.stop()
+        resource_pool = None
+    if isinstance(environment.runner, WorkerRunner):
+        flush_metrics(environment, final=True)
+        return
     if isinstance(environment.runner, MasterRunner):
-        logging.info("Test stopped on master, generating unified report")
-        all_metrics = []
-        if hasattr(sys, "master_reports"):
-            for worker_id, worker_metrics in sys.master_reports.items():
-                all_metrics.extend(worker_metrics)
-        else:
-            logging.warning("No master_reports attribute found on sys module")
-            all_metrics = []        
-        
-        if not all_metrics:
-            logging.warning("No metrics data to write to CSV")
-            return
+        wait_for_final_batches(environment.runner)
+    else:
+        flush_metrics(environment)
+    generator_health.log_summary()
+    if not report_writers or report_writers[0].rows_written == 0:
+        logging.warning("No metrics data to write to the report")
+        return
+    report_latency_percentiles()
 
-        start_time = datetime.now()
-        output_file = f"performance_report_{start_time.strftime('%Y%m%d_%H%M%S')}.csv"
+def wait_for_final_batches(runner):
+    """Wait up to METRICS_FINAL_TIMEOUT for the final metrics batch of every connected worker
+
+    On quit (run-time limit, Ctrl+C) the master fires test_stop before its workers were
+    told to stop, so any worker that hasn't sent its final batch is stopped from here.
+    Its teardown and final flush then arrive while we wait.
+    """
+    expected = {client.id for client in runner.clients.all if client.state != STATE_MISSING}
+    for client_id in expected - final_batches:
+        runner.send_message("stop", client_id=client_id)
+    deadline = time.monotonic() + METRICS_FINAL_TIMEOUT
+    while expected - final_batches and time.monotonic() < deadline:
+        gevent.sleep(0.1)
+    missing = expected - final_batches
+    if missing:
+        logging.warning(f"No final metrics from {len(missing)} worker(s) after {METRICS_FINAL_TIMEOUT:g}s; "
+                        f"their last samples are missing from the percentiles")
+
+def report_latency_percentiles():
+    """Log and persist p50/p90/p99/p99.9 per operation from the merged histograms"""
+    global percentiles_stale
+    percentiles_stale = False
+    if not latency_histograms or report_prefix is None:
+        return
+    for operation, histogram in sorted(latency_histograms.items()):
+        summary = ", ".join(f"p{p:g}={value:.2f}ms" for p, value in histogram.percentiles().items())
+        logging.info(f"{operation}: {histogram.total_count} successful requests, {summary}")
+    try:
+        write_percentiles(report_prefix.replace("performance_report_", "latency_percentiles_") + ".csv", latency_histograms)
+    except Exception as e:
+        logging.error(f"Failed to write latency percentiles: {str(e)}")
+
+def close_reports():
+    global health_writer
+    for writer in report_writers:
+        writer.close()
+    report_writers.clear()
+    if health_writer is not None:
+        health_writer.close()
+        health_writer = None
 
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    if percentiles_stale and not isinstance(environment.runner, WorkerRunner):
+        logging.info("Metrics arrived after the test stopped, rewriting the latency percentiles")
+        report_latency_percentiles()
+    close_reports()
+
+def record_health(worker_id, sample):
+    """Check a load-generator health sample and append it to the health sidecar"""
+    generator_health.record(worker_id, sample)
+    if health_writer is not None:
         try:
-            with open(output_file, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=["timestamp", "operation", "response_time", "status"])
-                writer.writeheader()
-                writer.writerows(all_metrics)
-            logging.info(f"Unified report generated: {output_file}")
+            health_writer.write_health(worker_id, sample)
         except Exception as e:
-            logging.error(f"Failed to generate report: {str(e)}")
-            
+            logging.error(f"Failed to write health sample from worker {worker_id}: {str(e)}")
+
 def handle_metrics_report(environment, msg, **kwargs):
-    """Master handler for worker metrics reports"""
+    """Master handler for worker metrics batches, appended to the report as they arrive"""
     worker_id = msg.data["worker_id"]
-    worker_metrics = msg.data["metrics"]
-    sys.master_reports[worker_id] = worker_metrics
-    logging.info(f"Received metrics from worker {worker_id} ({len(worker_metrics)} entries)")
+    batch = msg.data["metrics"]
+    merge_histograms(msg.data.get("histograms", {}))
+    for sample in msg.data.get("health", []):
+        record_health(worker_id, sample)
+    if batch is not None:
+        write_worker_batch(worker_id, batch)
+    if msg.data.get("final"):
+        final_batches.add(msg.node_id)
+
+def write_worker_batch(worker_id, batch):
+    if not report_writers:
+        logging.warning(f"Dropping {batch['count']} metrics from worker {worker_id}: no report open")
+        return
+    try:
+        write_batch(batch)
+    except Exception as e:
+        logging.error(f"Failed to write metrics from worker {worker_id}: {str(e)}")
+        return
+    logging.debug(f"Received metrics from worker {worker_id} ({batch['count']} entries)")
+
+def target_rate_pacing(interval):
+    """wait_time that keeps a user on a fixed schedule of one task every `interval` seconds
+
+    Unlike constant_pacing, the schedule is never reset: a task that overruns pushes
+    the next ones behind schedule, and that lag is stamped on the user's samples as
+    their intended start so analysis can correct for coordinated omission.
+    """
+    def wait_time_func(self):
+        now = time.monotonic()
+        self.next_task_due += interval
+        behind = now - self.next_task_due
+        self.metrics.schedule_lag_ms = max(0.0, behind) * 1000
+        return max(0.0, -behind)
+    return wait_time_func
+
+
+class XrayJourney(SequentialTaskSet):
+    """One end-to-end workflow: repo -> push -> policy -> watch -> scan -> violations
 
-class JFrogXrayUser(HttpUser):
-    wait_time = between(1, 5)
+    Steps run in dependency order and the journey is abandoned at the first failed
+    step, so no request is ever sent for a prerequisite that doesn't exist. Whatever
+    the journey created is handed to the resource pool: reused for reads when
+    complete, deleted when abandoned.
+    """
+
+    def require(self, success):
+        if not success:
+            if resource_pool is not None:
+                resource_pool.discard(self.user.journey_resources())
+            self.user.repo_key = self.user.policy_name = self.user.watch_name = None
+            # reschedule=False: the user still waits (think time or pacing) before its next pick
+            self.interrupt(reschedule=False)
+
+    @task
+    def create_repository(self):
+        self.require(self.user.create_repository())
+
+    @task
+    def push_image(self):
+        if DOCKER_ENABLED:
+            self.require(self.user.push_docker_image())
+
+    @task
+    def create_policy(self):
+        self.require(self.user.create_policy())
+
+    @task
+    def create_watch(self):
+        self.require(self.user.create_watch())
+
+    @task
+    def wait_for_scan(self):
+        """Wait on the scan poller's result (no polling here) before asking for violations"""
+        # The result tracked at push time: calling track() again after the scan completed
+        # would start a new entry and record a second scan_complete timed from here
+        if self.user.pushed_repo_key == self.user.repo_key and self.user.scan_result is not None \
+                and JOURNEY_SCAN_WAIT > 0:
+            scanned = self.user.scan_result.wait(timeout=JOURNEY_SCAN_WAIT)
+            if not scanned:
+                logging.debug(f"Scan of {self.user.repo_key} not complete after {JOURNEY_SCAN_WAIT}s, continuing")
+
+    @task
+    def get_violations(self):
+        resources = self.user.journey_resources()
+        self.user.get_violations(resources)
+        if resource_pool is not None:
+            resource_pool.add(resources)
+        self.user.repo_key = self.user.policy_name = self.user.watch_name = None
+        self.interrupt(reschedule=False)
+
+
+class SteadyStateReads(TaskSet):
+    """One read against a pooled repository/policy/watch set"""
+
+    def on_start(self):
+        self.resources = resource_pool.acquire() if resource_pool is not None else None
+        if self.resources is None:
+            # Nothing provisioned yet; wait, then let the user pick again
+            self.interrupt(reschedule=False)
+
+    @task
+    def check_scan_status(self):
+        if self.resources["pushed"]:
+            self.user.check_scan_status(self.resources["repo_key"])
+        else:
+            self.user.get_violations(self.resources)
+        self.interrupt(reschedule=False)
+
+    @task
+    def get_violations(self):
+        self.user.get_violations(self.resources)
+        self.interrupt(reschedule=False)
+
+
+class JFrogXrayTasks:
+    """Tasks, state and metrics shared by the HttpUser and FastHttpUser variants"""
+    wait_time = target_rate_pacing(TARGET_TASK_INTERVAL) if TARGET_TASK_INTERVAL > 0 \
+        else between(WAIT_TIME_MIN, WAIT_TIME_MAX)
     host = JFROG_URL
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.auth_header = {
-            "Authorization": f"Basic {base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode()).decode()}"
-        }
-        self.docker_client = docker.from_env()
+        self.auth_header = AUTH_HEADER
+        self.docker_client = None
+        self.tagged_image = None
+        self.pushed_repo_key = None
+        self.scan_result = None  # scan poller result of the last push
+        self.repo_key = None
+        self.policy_name = None
+        self.watch_name = None
         self.start_time = datetime.now()
+        self.metrics = metrics_recorder.new_buffer()
+        self.next_task_due = time.monotonic()
 
     def on_start(self):
-        """Setup initial configuration"""
+        """Setup initial configuration (repositories, policies and watches are created by journeys)"""
         try:
-            self.setup_docker()
-            self.create_repository()
-            self.create_policy()
-            self.policy_name = None
-            self.watch_name = None
+            if DOCKER_ENABLED:
+                self.setup_docker()
         except Exception as e:
             logging.error(f"Setup failed: {str(e)}")
             self.environment.runner.quit()
@@ -105,313 +404,240 @@ class JFrogXrayUser(HttpUser):
     def setup_docker(self):
         """Setup Docker environment"""
         try:
-            # Login to JFrog Docker registry
-            self.docker_client.login(
-                username=USERNAME,
-                password=PASSWORD,
-                registry=JFROG_URL.replace("https://", "")
-            )
+            # Shared per-worker client, logged in to the JFrog Docker registry once
+            self.docker_client = get_docker_client()
+            # Pull (and for registry mode, export) the image once per worker up front
+            if PUSH_MODE == 'registry':
+                get_registry_image()
+            else:
+                get_base_image()
         except Exception as e:
             logging.error(f"Docker setup failed: {str(e)}")
             raise
 
-    @task(1)
     def create_repository(self):
         """Create Docker repository"""
-        unique_repo_key = f"docker-local-{int(time.time())}-{self.environment.runner.user_count}"
-        repo_config = {
-            "key": unique_repo_key,
-            "projectKey": "",
-            "packageType": "docker",
-            "rclass": "local",
-            "xrayIndex": True
-        }
-        
-        with self.client.put(
-            f"/artifactory/api/repositories/{unique_repo_key}",
-            json=repo_config,
-            headers=self.auth_header,
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "create_repository",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "success"
-                })
-                self.repo_key = unique_repo_key
-            else:
-                response.failure(f"Failed to create repository: {response.text}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "create_repository",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "failed"
-                })
-
-    @task(2)
+        repo_key = jfrog_api.new_repo_key()
+        if not jfrog_api.create_repository(self.client, self.metrics, repo_key):
+            return False
+        self.repo_key = repo_key
+        return True
+
     def push_docker_image(self):
         """Push Docker image to repository"""
         try:
-            if not hasattr(self, 'repo_key') or not self.repo_key:
-                logging.error("Repository key not set. Ensure create_repository is called successfully first.")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "push_image",
-                    "response_time": 0,
-                    "status": "failed",
-                    "errors": ["No repository key set"]
-                })
-                return
-            logging.debug(f"Pulling image: {IMAGE_NAME}")
-            image = self.docker_client.images.pull(IMAGE_NAME)
-            tagged_image = f"{JFROG_URL.replace('https://', '')}/{self.repo_key}/{IMAGE_NAME.split(':')[0]}:3.9"
-            image.tag(tagged_image)
-
-            # Push the image
-            logging.debug(f"Pushing image: {tagged_image}")
-            push_log = self.docker_client.images.push(tagged_image, stream=True, decode=True)
-            errors = []
-            for line in push_log:
-                if 'error' in line:
-                    errors.append(line['error'])
-                    logging.error(f"Docker push error: {line['error']}")
-
-            if not errors:
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "push_image",
-                    "status": "success"
-                })
-            else:
-                logging.error(f"Failed to push image: {tagged_image}. Errors: {errors}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "push_image",
-                    "status": "failed",
-                    "errors": errors
-                })
+            if PUSH_MODE == 'registry':
+                return self.push_via_registry()
+            return self.push_via_docker()
         except docker.errors.APIError as e:
                 logging.error(f"Docker API error during push: {str(e)}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "push_image",
-                    "response_time": 0,
-                    "status": "failed",
-                    "errors": [str(e)]
-                })
+                self.metrics.record("push_image", 0, False)
         except Exception as e:
                 logging.error(f"Unexpected error during push: {str(e)}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "push_image",
-                    "response_time": 0,
-                    "status": "failed",
-                    "errors": [str(e)]
-                })
-
-    @task(3)
-    def create_policy(self):
-        """Create security policy"""
-        policy_name = f"sec_policy_{threading.get_ident()}_{int(time.time() * 1000)}" 
-        policy_config = {
-            "name": policy_name,
-            "description": "Test security policy",
-            "type": "security",
-            "rules": [{
-                "name": "test_rule",
-                "criteria": {
-                    "malicious_package": False,
-                    "fix_version_dependant": False,
-                    "min_severity": "high"
-                },
-                "actions": {
-                    "mails": [],
-                    "webhooks": [],
-                    "fail_build": False,
-                    "block_release_bundle_distribution": False,
-                    "block_release_bundle_promotion": False,
-                    "notify_deployer": False,
-                    "notify_watch_recipients": False,
-                    "create_ticket_enabled": False,
-                    "block_download": {
-                        "active": False,
-                        "unscanned": False
-                    }
-                },
-                "priority": 1
-            }]
-        }
-        
-        with self.client.post(
-            "/xray/api/v2/policies",
-            json=policy_config,
+                self.metrics.record("push_image", 0, False)
+        return False
+
+    def push_via_docker(self):
+        """Push through the local Docker daemon, re-tagging only when the target repository changes"""
+        tagged_image = f"{REGISTRY_HOST}/{self.repo_key}/{IMAGE_REPOSITORY}:{IMAGE_TAG}"
+        if tagged_image != self.tagged_image:
+            get_base_image().tag(tagged_image)
+            self.tagged_image = tagged_image
+
+        # Push the image, timing the streamed progress events
+        logging.debug(f"Pushing image: {tagged_image}")
+        progress = PushProgress()
+        for line in self.docker_client.images.push(tagged_image, stream=True, decode=True):
+            progress.feed(line)
+            if 'error' in line:
+                logging.error(f"Docker push error: {line['error']}")
+        progress.finish()
+
+        success = not progress.errors
+        exception = None if success else Exception("; ".join(progress.errors))
+        if not success:
+            logging.error(f"Failed to push image: {tagged_image}. Errors: {progress.errors}")
+        for layer_ms, layer_bytes in progress.completed_layers():
+            self.metrics.record("push_layer", layer_ms, True, layer_bytes)
+            self.fire_request_event("push_layer", layer_ms, layer_bytes)
+        if progress.ttfb_ms is not None:
+            self.metrics.record("push_image_ttfb", progress.ttfb_ms, success)
+            self.fire_request_event("push_image_ttfb", progress.ttfb_ms, 0, exception)
+        self.metrics.record("push_image", progress.total_ms, success, progress.bytes_transferred)
+        if success:
+            self.image_pushed()
+        self.fire_request_event("push_image", progress.total_ms, progress.bytes_transferred, exception)
+        logging.debug(f"Pushed {progress.bytes_transferred} bytes in {progress.total_ms:.0f} ms "
+                      f"({progress.mb_per_second:.2f} MB/s)")
+        return success
+
+    def image_pushed(self):
+        """Hand the pushed manifest to the scan poller to measure time to scan complete"""
+        self.pushed_repo_key = self.repo_key
+        self.scan_result = scan_poller.track(self.repo_key, ARTIFACT_PATH) if scan_poller is not None else None
+
+    def fire_request_event(self, name, response_time, response_length, exception=None):
+        """Report a non-HTTP measurement to Locust so it shows up in the UI stats"""
+        self.environment.events.request.fire(
+            request_type="DOCKER",
+            name=name,
+            response_time=response_time,
+            response_length=response_length,
+            exception=exception,
+            context={}
+        )
+
+    def push_via_registry(self):
+        """Upload blobs and manifest directly via the Docker Registry HTTP API, timing each phase"""
+        image = get_registry_image()
+        base_path = f"/v2/{self.repo_key}/{IMAGE_REPOSITORY}"
+        self.bytes_uploaded = 0
+        started = time.perf_counter()
+        success = all(
+            self.upload_blob(base_path, descriptor["digest"], image.blobs[descriptor["digest"]])
+            for descriptor in [image.config] + image.layers
+        )
+        if success:
+            with self.client.put(
+                f"{base_path}/manifests/{IMAGE_TAG}",
+                data=image.manifest,
+                headers=MANIFEST_HEADERS,
+                name=f"/v2/[repo]/{IMAGE_REPOSITORY}/manifests/{IMAGE_TAG}",
+                catch_response=True
+            ) as response:
+                success = response.status_code in (200, 201)
+                if success:
+                    response.success()
+                else:
+                    response.failure(f"Failed to put manifest: {response.text}")
+                self.metrics.record("push_manifest_put", response.request_meta["response_time"], success)
+        response_time = (time.perf_counter() - started) * 1000
+        self.metrics.record("push_image", response_time, success, self.bytes_uploaded)
+        if success:
+            self.image_pushed()
+        self.fire_request_event("push_image", response_time, self.bytes_uploaded,
+                                None if success else Exception("Registry push failed"))
+        return success
+
+    def upload_blob(self, base_path, digest, blob):
+        """HEAD the blob and upload it monolithically only if the registry doesn't have it yet"""
+        with self.client.head(
+            f"{base_path}/blobs/{digest}",
             headers=self.auth_header,
+            name=f"/v2/[repo]/{IMAGE_REPOSITORY}/blobs/[digest]",
             catch_response=True
         ) as response:
-            if response.status_code == 201:
+            exists = response.status_code == 200
+            if response.status_code in (200, 404):
                 response.success()
-                self.policy_name = policy_name
-                logging.debug(f"Policy created: {policy_name}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "create_policy",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "success"
-                })
-                return policy_name
+                self.metrics.record("push_blob_head", response.request_meta["response_time"], True)
             else:
-                response.failure(f"Failed to create policy: {response.text}")
-                logging.error(f"Policy creation failed: {response.text}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "create_policy",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "failed"
-                })
-
-    @task(4)
-    def create_watch(self):
-        """Create watch for repository"""
-        if not hasattr(self, "policy_name") or not self.policy_name:
-            logging.error("Policy name not set. Ensure create_policy is called successfully first.")
-            metrics_data.append({
-                "timestamp": datetime.now().isoformat(),
-                "operation": "create_watch",
-                "response_time": 0,
-                "status": "failed"
-            })
-            return None
-        watch_name = f"watch_{threading.get_ident()}_{int(time.time() * 1000)}"
-        watch_config = {
-            "general_data": {
-                "name": watch_name,
-                "description": "Test watch",
-                "active": True
-            },
-            "project_resources": {
-                "resources": [{
-                    "type": "repository",
-                    "bin_mgr_id": "default",
-                    "name": self.repo_key,
-                    "filters": []
-                }]
-            },
-            "assigned_policies": [
-            {
-                "name": self.policy_name,
-                "type": "security" 
-            }
-        ]
-    }
-        
+                response.failure(f"Blob HEAD failed with {response.status_code}")
+                self.metrics.record("push_blob_head", response.request_meta["response_time"], False)
+        if exists:
+            return True
+
+        started = time.perf_counter()
         with self.client.post(
-            "/xray/api/v2/watches",
-            json=watch_config,
+            f"{base_path}/blobs/uploads/",
             headers=self.auth_header,
+            name=f"/v2/[repo]/{IMAGE_REPOSITORY}/blobs/uploads/",
             catch_response=True
         ) as response:
-            if response.status_code in (200, 201):
-                response.success()
-                logging.debug(f"Watch {watch_name} created successfully")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "create_watch",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "success"
-                })
-                self.watch_name = watch_name
-                return watch_name
-            else:
-                response.failure(f"Failed to create watch: {response.text}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "create_watch",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "failed"
-                })
-
-    @task(5)
-    def check_scan_status(self):
-        """Check scan status"""
-        with self.client.post(
-            "/xray/api/v1/artifact/status",
-            json={"repo": self.repo_key, "path": f"/alpine/3.9/manifest.json"},
-            headers=self.auth_header,
+            if response.status_code != 202:
+                response.failure(f"Failed to start blob upload: {response.text}")
+                self.metrics.record("push_blob_upload", (time.perf_counter() - started) * 1000, False)
+                return False
+            response.success()
+            location = response.headers["Location"]
+        separator = '&' if '?' in location else '?'
+        with self.client.put(
+            f"{location}{separator}digest={digest}",
+            data=blob,
+            headers=BLOB_HEADERS,
+            name=f"/v2/[repo]/{IMAGE_REPOSITORY}/blobs/uploads/[uuid]",
             catch_response=True
         ) as response:
-            if response.status_code == 200:
+            success = response.status_code == 201
+            if success:
                 response.success()
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "check_scan_status",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "success"
-                })
+                self.bytes_uploaded += len(blob)
             else:
-                response.failure(f"Scan not complete or failed: {response.text}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "check_scan_status",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "failed"
-                })
-
-    @task(6)
-    def get_violations(self):
-        """Get security violations"""
-        violation_config = {
-            "filters": {
-                "watch_name": self.watch_name,
-                "violation_type": "Security",
-                "min_severity": "High",
-                "resources": {
-                    "artifacts": [{
-                        "repo": self.repo_key,
-                        "path": "alpine/3.9/manifest.json"
-                    }]
-                },
-                "pagination": {
-                    "order_by": "created",
-                    "direction": "asc",
-                    "limit": 100,
-                    "offset": 1
-                }
-            }
+                response.failure(f"Failed to upload blob {digest}: {response.text}")
+        self.metrics.record("push_blob_upload", (time.perf_counter() - started) * 1000, success, len(blob))
+        return success
+
+    def create_policy(self):
+        """Create security policy"""
+        policy_name = jfrog_api.new_policy_name()
+        if not jfrog_api.create_policy(self.client, self.metrics, policy_name):
+            return False
+        self.policy_name = policy_name
+        return True
+
+    def create_watch(self):
+        """Create watch for repository"""
+        watch_name = jfrog_api.new_watch_name()
+        if not jfrog_api.create_watch(self.client, self.metrics, watch_name, self.repo_key, self.policy_name):
+            return False
+        self.watch_name = watch_name
+        return True
+
+    def journey_resources(self):
+        """Resources created by the current journey, in the resource pool's set format"""
+        return {
+            "repo_key": self.repo_key,
+            "policy_name": self.policy_name,
+            "watch_name": self.watch_name,
+            "pushed": self.repo_key is not None and self.pushed_repo_key == self.repo_key,
         }
-        
-        with self.client.post(
-            "/xray/api/v1/violations",
-            json=violation_config,
-            headers=self.auth_header,
-            catch_response=True
-        ) as response:
-            if response.status_code == 200:
-                response.success()
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "get_violations",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "success"
-                })
-            else:
-                response.failure(f"Failed to get violations: {response.text}")
-                metrics_data.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "operation": "get_violations",
-                    "response_time": response.request_meta["response_time"],
-                    "status": "failed"
-                })
+
+    def check_scan_status(self, repo_key):
+        """Check scan status of a pushed image (completion is tracked by the scan poller)"""
+        return jfrog_api.check_scan_status(self.client, self.metrics, repo_key, ARTIFACT_PATH)
+
+    def get_violations(self, resources):
+        """Get security violations of the image in a repository/watch set"""
+        return jfrog_api.get_violations(self.client, self.metrics, resources["watch_name"], resources["repo_key"],
+                                        ARTIFACT_PATH)
 
     def on_stop(self):
-        """Send metrics to master at user completion"""
-        if isinstance(self.environment.runner, WorkerRunner):
-            worker_id = self.environment.runner.worker_index
-            logging.info(f"Worker {worker_id} sending {len(metrics_data)} metrics to master")
-            self.environment.runner.send_message("metrics_report", {
-                "worker_id": worker_id,
-                "metrics": metrics_data.copy()
-            })
-        metrics_data.clear()  # Clear local metrics after reporting
+        """Hand the user's buffer back so its last samples go out with the next flush"""
+        if resource_pool is not None and self.repo_key is not None:
+            # Stopped mid-journey: clean up what the journey created so far
+            resource_pool.discard(self.journey_resources())
+        metrics_recorder.release(self.metrics)
+
+
+class JFrogXrayUser(JFrogXrayTasks, HttpUser):
+    """requests-based user (USER_CLASS=http)"""
+    abstract = USER_CLASS != 'http'
+    tasks = {XrayJourney: JOURNEY_WEIGHT, SteadyStateReads: READ_WEIGHT}
+
+
+class JFrogXrayFastUser(JFrogXrayTasks, FastHttpUser):
+    """geventhttpclient-based user (USER_CLASS=fast) for driving more users per core
+
+    Each user runs one request at a time, so a small keep-alive pool per user suffices.
+    """
+    abstract = USER_CLASS != 'fast'
+    tasks = {XrayJourney: JOURNEY_WEIGHT, SteadyStateReads: READ_WEIGHT}
+    concurrency = FASTHTTP_CONCURRENCY
+    connection_timeout = FASTHTTP_CONNECTION_TIMEOUT
+    network_timeout = FASTHTTP_NETWORK_TIMEOUT
+    max_retries = 0
+
+
+class StepLoadShape(LoadTestShape):
+    """Staircase load (LOAD_SHAPE=step): STEP_USERS more users every STEP_DURATION seconds
+
+    Each step is held long enough to reach a steady state, so `analysis.py --knee`
+    can find the step where latency or errors break their SLO.
+    """
+    abstract = LOAD_SHAPE != 'step'
+
+    def tick(self):
+        step = int(self.get_run_time() // STEP_DURATION)
+        if step >= STEP_COUNT:
+            return None
+        return STEP_USERS * (step + 1), STEP_SPAWN_RATE
@@ -0,0 +1,232 @@
+import math
+import sys
+import time
+from array import array
+from datetime import datetime
+from latency_histogram import LatencyHistogram
+
+# Operation ids are stored as a single byte per sample; append new operations at the end
+OPERATIONS = (
+    "create_repository",
+    "push_image",
+    "create_policy",
+    "create_watch",
+    "check_scan_status",
+    "get_violations",
+    "push_blob_head",
+    "push_blob_upload",
+    "push_manifest_put",
+    "push_image_ttfb",
+    "push_layer",
+    "scan_status_poll",
+    "scan_complete",
+    "delete_watch",
+    "delete_policy",
+    "delete_repository",
+)
+OPERATION_IDS = {name: op_id for op_id, name in enumerate(OPERATIONS)}
+
+STATUS_FAILED = 0
+STATUS_SUCCESS = 1
+STATUSES = ("failed", "success")
+
+# Samples are stamped with the monotonic clock; this offset turns them into epoch ns at report time
+CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+# Columns of a metrics batch: (name, array typecode)
+COLUMNS = (
+    ("timestamps", 'q'),
+    ("operations", 'B'),
+    ("response_times", 'd'),
+    ("statuses", 'b'),
+    ("response_lengths", 'q'),
+    # When the request should have started under the user's target-rate schedule (0 = unknown)
+    ("intended_starts", 'q'),
+    # Request phases in ms with PHASE_TIMING (NaN = not measured) and whether the
+    # connection was reused (1), newly opened (0) or unknown (-1)
+    ("connect_times", 'f'),
+    ("tls_times", 'f'),
+    ("ttfb_times", 'f'),
+    ("body_times", 'f'),
+    ("connections_reused", 'b'),
+)
+# Fill value of columns missing from batches sent by older workers (default 0)
+MISSING_VALUES = {
+    "connect_times": math.nan,
+    "tls_times": math.nan,
+    "ttfb_times": math.nan,
+    "body_times": math.nan,
+    "connections_reused": -1,
+}
+
+
+def new_columns():
+    return tuple(array(typecode) for _, typecode in COLUMNS)
+
+
+class MetricsBuffer:
+    """Append-only columnar sample buffer owned by a single user greenlet"""
+
+    __slots__ = ("timestamps", "operations", "response_times", "statuses", "response_lengths", "intended_starts",
+                 "connect_times", "tls_times", "ttfb_times", "body_times", "connections_reused",
+                 "histograms", "phase_source", "schedule_lag_ms")
+
+    def __init__(self, histograms, phase_source=None):
+        self.histograms = histograms
+        # Returns (connect, tls, ttfb, reused) of the requests behind the next sample, or None
+        self.phase_source = phase_source
+        # How far behind its schedule the owner started the current task (set by the pacer)
+        self.schedule_lag_ms = 0.0
+        self._reset()
+
+    def _reset(self):
+        (self.timestamps, self.operations, self.response_times, self.statuses, self.response_lengths,
+         self.intended_starts, self.connect_times, self.tls_times, self.ttfb_times, self.body_times,
+         self.connections_reused) = new_columns()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def record(self, operation, response_time, success, response_length=0, schedule_lag_ms=None):
+        """Record one sample; string formatting is deferred until the report is written
+
+        The intended start is the actual start (now - response_time) moved back by the
+        schedule lag, so analysis can measure latency from when the request was due.
+        """
+        op_id = OPERATION_IDS[operation]
+        now = time.monotonic_ns()
+        lag_ms = self.schedule_lag_ms if schedule_lag_ms is None else schedule_lag_ms
+        self.timestamps.append(now)
+        self.intended_starts.append(now - int(((response_time or 0.0) + lag_ms) * 1_000_000))
+        self.operations.append(op_id)
+        self.response_times.append(math.nan if response_time is None else response_time)
+        self.statuses.append(STATUS_SUCCESS if success else STATUS_FAILED)
+        self.response_lengths.append(response_length or 0)
+        phases = self.phase_source() if self.phase_source is not None else None
+        if phases is None:
+            self.connect_times.append(math.nan)
+            self.tls_times.append(math.nan)
+            self.ttfb_times.append(math.nan)
+            self.body_times.append(math.nan)
+            self.connections_reused.append(-1)
+        else:
+            connect, tls, ttfb, body, reused = phases
+            self.connect_times.append(connect)
+            self.tls_times.append(tls)
+            self.ttfb_times.append(ttfb)
+            self.body_times.append(body)
+            self.connections_reused.append(1 if reused else 0)
+        if success and response_time is not None:
+            self.histograms[op_id].record(response_time)
+
+    def take(self):
+        """Hand over the current columns and start new ones (atomic between greenlet switches)"""
+        columns = (self.timestamps, self.operations, self.response_times, self.statuses, self.response_lengths,
+                   self.intended_starts, self.connect_times, self.tls_times, self.ttfb_times, self.body_times,
+                   self.connections_reused)
+        self._reset()
+        return columns
+
+
+class MetricsRecorder:
+    """Worker-level registry of per-user buffers, drained into compact columnar batches
+
+    Successful response times are also aggregated into one latency histogram per
+    operation, shared by all buffers of the worker. With a `phase_source` (see
+    phase_timing.py) every sample also carries its request phases.
+    """
+
+    def __init__(self, phase_source=None):
+        self._buffers = []
+        self._released = []
+        self.histograms = [LatencyHistogram() for _ in OPERATIONS]
+        self.phase_source = phase_source
+
+    def new_buffer(self):
+        buffer = MetricsBuffer(self.histograms, self.phase_source)
+        self._buffers.append(buffer)
+        return buffer
+
+    def release(self, buffer):
+        """Stop tracking a buffer once its remaining samples have been drained"""
+        if buffer in self._buffers:
+            self._buffers.remove(buffer)
+            self._released.append(buffer)
+
+    def drain(self, batch_size):
+        """Collect all buffered samples and yield encoded batches of at most batch_size rows"""
+        buffers = self._buffers + self._released
+        self._released = []
+        columns = new_columns()
+        for buffer in buffers:
+            if not len(buffer):
+                continue
+            for column, taken in zip(columns, buffer.take()):
+                column.extend(taken)
+        for i in range(0, len(columns[0]), batch_size):
+            yield encode_batch([column[i:i + batch_size] for column in columns])
+
+    def take_histograms(self):
+        """Snapshot and reset the per-operation histograms, keyed by operation name"""
+        snapshots = {}
+        for op_id, histogram in enumerate(self.histograms):
+            if histogram.total_count:
+                snapshots[OPERATIONS[op_id]] = histogram.to_snapshot()
+                histogram.reset()
+        return snapshots
+
+
+def encode_batch(columns):
+    """Pack columns into a message-friendly dict of raw bytes"""
+    batch = {
+        "count": len(columns[0]),
+        "byteorder": sys.byteorder,
+        "clock_offset_ns": CLOCK_OFFSET_NS,
+    }
+    for (name, _), column in zip(COLUMNS, columns):
+        batch[name] = column.tobytes()
+    return batch
+
+
+def decode_columns(batch):
+    """Unpack a batch into arrays in COLUMNS order, with timestamps converted to epoch ns"""
+    columns = []
+    for name, typecode in COLUMNS:
+        column = array(typecode)
+        if name in batch:
+            column.frombytes(batch[name])
+            if batch["byteorder"] != sys.byteorder:
+                column.byteswap()
+        else:
+            # Batch from an older worker without this column
+            column.extend([MISSING_VALUES.get(name, 0)] * batch["count"])
+        columns.append(column)
+    offset = batch["clock_offset_ns"]
+    columns[0] = array('q', (t + offset for t in columns[0]))
+    columns[5] = array('q', (t + offset if t else 0 for t in columns[5]))
+    return tuple(columns)
+
+
+def decode_batch(batch):
+    """Convert a batch into report rows, formatting timestamps only now"""
+    (timestamps, operations, response_times, statuses, response_lengths, intended_starts,
+     connect_times, tls_times, ttfb_times, body_times, connections_reused) = decode_columns(batch)
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(ts / 1e9).isoformat(),
+            "operation": OPERATIONS[op],
+            "response_time": "" if math.isnan(rt) else rt,
+            "status": STATUSES[st],
+            "response_length": length,
+            "intended_start": datetime.fromtimestamp(intended / 1e9).isoformat() if intended else "",
+            "connect_time": "" if math.isnan(connect) else round(connect, 3),
+            "tls_time": "" if math.isnan(tls) else round(tls, 3),
+            "ttfb": "" if math.isnan(ttfb) else round(ttfb, 3),
+            "body_time": "" if math.isnan(body) else round(body, 3),
+            "connection_reused": "" if reused < 0 else reused,
+        }
+        for ts, op, rt, st, length, intended, connect, tls, ttfb, body, reused
+        in zip(timestamps, operations, response_times, statuses, response_lengths, intended_starts,
+               connect_times, tls_times, ttfb_times, body_times, connections_reused)
+    ]
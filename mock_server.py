@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import re
+import time
+
+logging.basicConfig(level=logging.INFO)
+
+# Stand-in for the Artifactory/Xray endpoints used by locustfile.py, so the load
+# generator's own ceiling can be measured without touching JFROG_URL
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class LatencyDistribution:
+    """Parses "fixed:MS", "uniform:LOW,HIGH", "exponential:MEAN" or "lognormal:MEDIAN,SIGMA" (all in ms)"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        kind, _, params = spec.partition(':')
+        values = [float(v) for v in params.split(',') if v]
+        if kind == 'fixed':
+            (delay,) = values or [0.0]
+            self._sample = lambda: delay
+        elif kind == 'uniform':
+            low, high = values
+            self._sample = lambda: random.uniform(low, high)
+        elif kind == 'exponential':
+            (mean,) = values
+            self._sample = lambda: random.expovariate(1.0 / mean) if mean else 0.0
+        elif kind == 'lognormal':
+            median, sigma = values
+            mu = math.log(median)
+            self._sample = lambda: random.lognormvariate(mu, sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample_seconds(self):
+        return self._sample() / 1000.0
+
+
+def artifact_status(body):
+    return 200, {
+        "overall": {"status": "DONE", "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())},
+        "details": {"sbom": {"status": "DONE"}, "contextual_analysis": {"status": "NOT_SUPPORTED"}}
+    }
+
+
+# (method, path pattern, handler) — handlers return (status, JSON body or None)
+ROUTES = [
+    ("PUT", re.compile(r"^/artifactory/api/repositories/[^/]+$"),
+     lambda body: (200, None)),
+    ("POST", re.compile(r"^/xray/api/v2/policies$"),
+     lambda body: (201, None)),
+    ("POST", re.compile(r"^/xray/api/v2/watches$"),
+     lambda body: (201, None)),
+    ("POST", re.compile(r"^/xray/api/v1/artifact/status$"),
+     artifact_status),
+    ("POST", re.compile(r"^/xray/api/v1/violations$"),
+     lambda body: (200, {"total_violations": 0, "violations": []})),
+    ("DELETE", re.compile(r"^/artifactory/api/repositories/[^/]+$"),
+     lambda body: (200, None)),
+    ("DELETE", re.compile(r"^/xray/api/v2/policies/[^/]+$"),
+     lambda body: (200, None)),
+    ("DELETE", re.compile(r"^/xray/api/v2/watches/[^/]+$"),
+     lambda body: (200, None)),
+]
+
+
+class MockJFrogServer:
+    def __init__(self, latency, error_rate):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests_served = 0
+
+    def route(self, method, path, body):
+        for route_method, pattern, handler in ROUTES:
+            if route_method == method and pattern.match(path):
+                if self.error_rate and random.random() < self.error_rate:
+                    return 500, {"errors": [{"status": 500, "message": "Injected failure"}]}
+                return handler(body)
+        return 404, {"errors": [{"status": 404, "message": f"No mock for {method} {path}"}]}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode('latin-1').split("\r\n")
+                method, target, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                delay = self.latency.sample_seconds()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                status, payload = self.route(method, target.split('?', 1)[0], body)
+                content = json.dumps(payload).encode() if payload is not None else b""
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode('latin-1') + content
+                )
+                await writer.drain()
+                self.requests_served += 1
+                if headers.get('connection', '').lower() == 'close':
+                    return
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        logging.info(f"Mock JFrog server listening on http://{host}:{port} "
+                     f"(latency {self.latency.spec}, error rate {self.error_rate})")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Artifactory/Xray server for load-generator benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv('MOCK_PORT', '8081')))
+    parser.add_argument("--latency", default=os.getenv('MOCK_LATENCY', 'fixed:0'),
+                        help="fixed:MS | uniform:LOW,HIGH | exponential:MEAN | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv('MOCK_ERROR_RATE', '0')),
+                        help="Fraction of requests answered with HTTP 500")
+    args = parser.parse_args()
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    server = MockJFrogServer(LatencyDistribution(args.latency), args.error_rate)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logging.info(f"Mock JFrog server stopped after {server.requests_served} requests")
+
+
+if __name__ == "__main__":
+    main()
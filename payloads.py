@@ -0,0 +1,144 @@
+import base64
+import functools
+import json
+import re
+from config import USERNAME, PASSWORD
+
+# Request bodies serialized once per worker: each body is a byte template with only its
+# varying fields (names, repo key) spliced in per request, so tasks don't rebuild nested
+# dicts and re-encode them with stdlib json on every call.
+
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    orjson = None
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":"), allow_nan=False).encode()
+
+# Shared, precomputed headers: treat as read-only, they are reused by every request
+AUTH_HEADER = {
+    "Authorization": f"Basic {base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode()).decode()}"
+}
+JSON_HEADERS = {**AUTH_HEADER, "Content-Type": "application/json"}
+
+_FIELD_MARKER = re.compile(rb'"@@(\w+)@@"')
+
+
+# Names are reused across requests (pooled resources, the artifact path), so their
+# encoded form is cached
+encode_string = functools.lru_cache(maxsize=4096)(dumps)
+
+
+class PayloadTemplate:
+    """JSON body serialized once with placeholder string fields, rendered by splicing in encoded values"""
+
+    def __init__(self, builder, *fields):
+        body = dumps(builder(**{field: f"@@{field}@@" for field in fields}))
+        pieces = _FIELD_MARKER.split(body)
+        self.fields = tuple(field.decode() for field in pieces[1::2])
+        # Literal parts joined by %s, with any literal % escaped, so rendering is one bytes format
+        self.format = b"%s".join(literal.replace(b"%", b"%%") for literal in pieces[0::2])
+        self.builder = builder
+
+    def render(self, **values):
+        return self.format % tuple([encode_string(values[field]) for field in self.fields])
+
+
+def repository_config(repo_key):
+    return {
+        "key": repo_key,
+        "projectKey": "",
+        "packageType": "docker",
+        "rclass": "local",
+        "xrayIndex": True
+    }
+
+
+def policy_config(policy_name):
+    return {
+        "name": policy_name,
+        "description": "Test security policy",
+        "type": "security",
+        "rules": [{
+            "name": "test_rule",
+            "criteria": {
+                "malicious_package": False,
+                "fix_version_dependant": False,
+                "min_severity": "high"
+            },
+            "actions": {
+                "mails": [],
+                "webhooks": [],
+                "fail_build": False,
+                "block_release_bundle_distribution": False,
+                "block_release_bundle_promotion": False,
+                "notify_deployer": False,
+                "notify_watch_recipients": False,
+                "create_ticket_enabled": False,
+                "block_download": {
+                    "active": False,
+                    "unscanned": False
+                }
+            },
+            "priority": 1
+        }]
+    }
+
+
+def watch_config(watch_name, repo_key, policy_name):
+    return {
+        "general_data": {
+            "name": watch_name,
+            "description": "Test watch",
+            "active": True
+        },
+        "project_resources": {
+            "resources": [{
+                "type": "repository",
+                "bin_mgr_id": "default",
+                "name": repo_key,
+                "filters": []
+            }]
+        },
+        "assigned_policies": [{
+            "name": policy_name,
+            "type": "security"
+        }]
+    }
+
+
+def artifact_status_config(repo_key, path):
+    return {"repo": repo_key, "path": path}
+
+
+def violation_config(watch_name, repo_key, path):
+    return {
+        "filters": {
+            "watch_name": watch_name,
+            "violation_type": "Security",
+            "min_severity": "High",
+            "resources": {
+                "artifacts": [{
+                    "repo": repo_key,
+                    "path": path
+                }]
+            },
+            "pagination": {
+                "order_by": "created",
+                "direction": "asc",
+                "limit": 100,
+                "offset": 1
+            }
+        }
+    }
+
+
+REPOSITORY = PayloadTemplate(repository_config, "repo_key")
+POLICY = PayloadTemplate(policy_config, "policy_name")
+WATCH = PayloadTemplate(watch_config, "watch_name", "repo_key", "policy_name")
+ARTIFACT_STATUS = PayloadTemplate(artifact_status_config, "repo_key", "path")
+VIOLATIONS = PayloadTemplate(violation_config, "watch_name", "repo_key", "path")
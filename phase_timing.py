@@ -0,0 +1,155 @@
+import functools
+import logging
+import threading
+import time
+
+# Opt-in (PHASE_TIMING=true) per-request phase timing for the requests/urllib3 client used
+# by HttpUser, the resource pool and the scan poller. urllib3's connection class is
+# wrapped once per process; each greenlet accumulates its own phases (threading.local is
+# greenlet-local under Locust's gevent monkey patching) until the next sample takes them.
+#
+#   connect: TCP connect including DNS resolution, 0 on a reused connection
+#   tls:     TLS handshake (and proxy tunnel), 0 on a reused or plain HTTP connection
+#   ttfb:    sending the request until the response headers arrived
+#   body:    reading the response body (time spent inside urllib3's read/stream only,
+#            so client overhead around the request is in none of the phases)
+
+_state = None
+
+
+def _now_ms():
+    return time.perf_counter() * 1000
+
+
+class _Phases:
+    """Phase totals of one greenlet since its last sample"""
+
+    __slots__ = ("connect", "tls", "ttfb", "body", "opened", "requests", "setup_at_request", "request_started")
+
+    def __init__(self):
+        self.connect = self.tls = self.ttfb = self.body = 0.0
+        self.opened = self.requests = 0
+        self.setup_at_request = 0.0
+        self.request_started = None
+
+
+def _phases():
+    phases = getattr(_state, "phases", None)
+    if phases is None:
+        phases = _state.phases = _Phases()
+    return phases
+
+
+def _wrap(cls, name, wrapper):
+    original = getattr(cls, name)
+
+    @functools.wraps(original)
+    def patched(self, *args, **kwargs):
+        return wrapper(original, self, *args, **kwargs)
+
+    setattr(cls, name, patched)
+
+
+def _timed_new_conn(original, conn, *args, **kwargs):
+    started = _now_ms()
+    try:
+        return original(conn, *args, **kwargs)
+    finally:
+        _phases().connect += _now_ms() - started
+
+
+def _timed_connect(original, conn, *args, **kwargs):
+    phases = _phases()
+    if getattr(_state, "connecting", False):
+        # connect() implemented on top of another wrapped connect(): time the outermost only
+        return original(conn, *args, **kwargs)
+    _state.connecting = True
+    started, tcp_before = _now_ms(), phases.connect
+    try:
+        return original(conn, *args, **kwargs)
+    finally:
+        _state.connecting = False
+        phases.tls += max(0.0, _now_ms() - started - (phases.connect - tcp_before))
+        phases.opened += 1
+
+
+def _timed_request(original, conn, *args, **kwargs):
+    phases = _phases()
+    phases.requests += 1
+    phases.setup_at_request = phases.connect + phases.tls
+    phases.request_started = _now_ms()
+    return original(conn, *args, **kwargs)
+
+
+def _timed_getresponse(original, conn, *args, **kwargs):
+    try:
+        return original(conn, *args, **kwargs)
+    finally:
+        phases = _phases()
+        if phases.request_started is not None:
+            # Connection setup done inside request() (plain HTTP connects lazily) is not TTFB
+            setup = phases.connect + phases.tls - phases.setup_at_request
+            phases.ttfb += max(0.0, _now_ms() - phases.request_started - setup)
+            phases.request_started = None
+
+
+def _timed_read(original, response, *args, **kwargs):
+    if getattr(_state, "reading", False):
+        # read() called from within a timed stream()
+        return original(response, *args, **kwargs)
+    _state.reading = True
+    started = _now_ms()
+    try:
+        return original(response, *args, **kwargs)
+    finally:
+        _state.reading = False
+        _phases().body += _now_ms() - started
+
+
+def _timed_stream(original, response, *args, **kwargs):
+    """Time only the generator's own work, not what the consumer does between chunks"""
+    chunks = original(response, *args, **kwargs)
+    while True:
+        _state.reading = True
+        started = _now_ms()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _state.reading = False
+            _phases().body += _now_ms() - started
+        yield chunk
+
+
+def take():
+    """(connect ms, tls ms, ttfb ms, body ms, reused) of this greenlet's requests since the last take
+
+    None when the greenlet made no request through urllib3 in the meantime (e.g. a
+    sample that is not an HTTP call). `reused` is True when no new connection was opened.
+    """
+    phases = getattr(_state, "phases", None)
+    if phases is None or not phases.requests:
+        return None
+    _state.phases = None
+    return phases.connect, phases.tls, phases.ttfb, phases.body, phases.opened == 0
+
+
+def install():
+    """Wrap urllib3's connection classes once and return the phase source for MetricsRecorder"""
+    global _state
+    if _state is None:
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.response import HTTPResponse
+
+        _state = threading.local()
+        _wrap(HTTPConnection, "_new_conn", _timed_new_conn)
+        _wrap(HTTPConnection, "connect", _timed_connect)
+        if "connect" in vars(HTTPSConnection):
+            _wrap(HTTPSConnection, "connect", _timed_connect)
+        _wrap(HTTPConnection, "request", _timed_request)
+        _wrap(HTTPConnection, "getresponse", _timed_getresponse)
+        _wrap(HTTPResponse, "read", _timed_read)
+        _wrap(HTTPResponse, "stream", _timed_stream)
+        logging.info("Phase timing enabled for requests/urllib3 connections")
+    return take
@@ -0,0 +1,80 @@
+import csv
+import logging
+import os
+from datetime import datetime
+from latency_histogram import REPORTED_PERCENTILES
+from metrics_recorder import decode_batch
+
+# Columns of the unified performance report
+REPORT_FIELDS = ["timestamp", "operation", "response_time", "status", "response_length", "intended_start",
+                 "connect_time", "tls_time", "ttfb", "body_time", "connection_reused"]
+# Columns of the generator health sidecar written next to the report
+HEALTH_FIELDS = ["timestamp", "worker_id", "cpu_percent", "greenlets", "loop_lag_ms", "loop_lag_max_ms",
+                 "rss_mb", "open_sockets"]
+
+
+def health_report_path(report_prefix):
+    """Health sidecar of a report, e.g. performance_report_X -> generator_health_X.csv"""
+    directory, name = os.path.split(report_prefix)
+    return os.path.join(directory, name.replace("performance_report_", "generator_health_", 1) + ".csv")
+
+
+class CsvReportWriter:
+    """Append-only CSV report written incrementally as metric batches arrive"""
+
+    def __init__(self, path, fieldnames=REPORT_FIELDS):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.rows_written = 0
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        # Opened lazily so a run without any metrics leaves no empty report behind
+        self._file = open(self.path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
+        self._writer.writeheader()
+        logging.info(f"Streaming unified report to {self.path}")
+
+    def write_rows(self, rows):
+        """Append a batch of metric rows and flush them to disk"""
+        if not rows:
+            return
+        if self._file is None:
+            self._open()
+        self._writer.writerows(rows)
+        self._file.flush()
+        self.rows_written += len(rows)
+
+    def write_health(self, worker_id, sample):
+        """Append one generator health sample (health sidecar only)"""
+        self.write_rows([{
+            **sample,
+            "timestamp": datetime.fromtimestamp(sample["timestamp"]).isoformat(),
+            "worker_id": worker_id
+        }])
+
+    def write_batch(self, batch):
+        """Append a metrics batch produced by MetricsRecorder.drain()"""
+        self.write_rows(decode_batch(batch))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logging.info(f"Unified report generated: {self.path} ({self.rows_written} rows)")
+
+
+def write_percentiles(path, histograms):
+    """Write per-operation latency percentiles from merged histograms"""
+    fieldnames = ["operation", "count", "mean", "min"] + [f"p{p:g}" for p in REPORTED_PERCENTILES] + ["max"]
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for operation, histogram in sorted(histograms.items()):
+            writer.writerow(
+                [operation, histogram.total_count, f"{histogram.mean_ms:.2f}", f"{histogram.min_ms:.2f}"]
+                + [f"{value:.2f}" for value in histogram.percentiles().values()]
+                + [f"{histogram.max_ms:.2f}"]
+            )
+    logging.info(f"Latency percentiles written to {path}")
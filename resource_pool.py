@@ -0,0 +1,121 @@
+import logging
+from collections import OrderedDict
+import gevent
+from gevent.pool import Pool
+from locust.clients import HttpSession
+import jfrog_api
+from config import JFROG_URL, RESOURCE_POOL_SIZE, RESOURCE_POOL_MAX, RESOURCE_POOL_CONCURRENCY, RESOURCE_CLEANUP
+
+# (kind, key in a resource set) in deletion order: a watch references its policy and
+# repository, so it must go first
+DELETE_ORDER = (("watch", "watch_name"), ("policy", "policy_name"), ("repository", "repo_key"))
+
+
+class ResourcePool:
+    """Worker-level pool of repository/policy/watch sets shared by all users
+
+    A bounded number of sets is provisioned up front for read traffic, journeys add
+    the sets they create, and the least recently used set is evicted (and deleted)
+    once the pool holds more than RESOURCE_POOL_MAX. Every resource created on this
+    worker is tracked, and whatever is left is bulk-deleted in parallel at test stop.
+    """
+
+    def __init__(self, environment, recorder):
+        self.client = HttpSession(
+            base_url=environment.host or JFROG_URL,
+            request_event=environment.events.request,
+            user=None
+        )
+        self.recorder = recorder
+        self.metrics = recorder.new_buffer()
+        self._sets = OrderedDict()  # repo key -> resource set, least recently used first
+        self._provisioning = Pool(RESOURCE_POOL_CONCURRENCY)
+        self._deletes = Pool(RESOURCE_POOL_CONCURRENCY)
+        self._provisioner = None
+
+    def start(self):
+        if self._provisioner is None and RESOURCE_POOL_SIZE > 0:
+            self._provisioner = gevent.spawn(self._provision, RESOURCE_POOL_SIZE)
+
+    def _provision(self, count):
+        created = sum(self._provisioning.imap_unordered(lambda _: self._provision_one(), range(count)))
+        logging.info(f"Resource pool provisioned {created}/{count} repository/policy/watch set(s)")
+
+    def _provision_one(self):
+        resources = {"repo_key": None, "policy_name": None, "watch_name": None, "pushed": False}
+        complete = False
+        try:
+            repo_key = jfrog_api.new_repo_key()
+            if not jfrog_api.create_repository(self.client, self.metrics, repo_key):
+                return False
+            resources["repo_key"] = repo_key
+            policy_name = jfrog_api.new_policy_name()
+            if not jfrog_api.create_policy(self.client, self.metrics, policy_name):
+                return False
+            resources["policy_name"] = policy_name
+            watch_name = jfrog_api.new_watch_name()
+            if not jfrog_api.create_watch(self.client, self.metrics, watch_name, repo_key, policy_name):
+                return False
+            resources["watch_name"] = watch_name
+            complete = True
+            return True
+        finally:
+            # Also runs when stop() kills provisioning, so half-built sets are not leaked
+            if complete:
+                self.add(resources)
+            else:
+                self.discard(resources)
+
+    def __len__(self):
+        return len(self._sets)
+
+    def acquire(self):
+        """Least recently used complete set (marked most recently used), or None while empty"""
+        if not self._sets:
+            return None
+        repo_key, resources = next(iter(self._sets.items()))
+        self._sets.move_to_end(repo_key)
+        return resources
+
+    def add(self, resources):
+        """Add a complete set created elsewhere (e.g. by a journey), evicting the LRU set if full"""
+        self._sets[resources["repo_key"]] = resources
+        self._sets.move_to_end(resources["repo_key"])
+        while len(self._sets) > RESOURCE_POOL_MAX:
+            _, evicted = self._sets.popitem(last=False)
+            self.discard(evicted)
+
+    def discard(self, resources):
+        """Delete a set (possibly partial) in the background"""
+        if RESOURCE_CLEANUP and any(resources.get(key) for _, key in DELETE_ORDER):
+            self._deletes.spawn(self._delete_set, resources)
+
+    def _delete_set(self, resources):
+        for kind, key in DELETE_ORDER:
+            if resources.get(key):
+                jfrog_api.delete_resource(self.client, self.metrics, kind, resources[key])
+
+    def _delete_all(self, sets):
+        """Bulk delete: parallel within a kind, one kind after another to respect references"""
+        deleter = Pool(RESOURCE_POOL_CONCURRENCY)
+        for kind, key in DELETE_ORDER:
+            names = [resources[key] for resources in sets if resources.get(key)]
+            deleter.map(lambda name: jfrog_api.delete_resource(self.client, self.metrics, kind, name), names)
+
+    def stop(self):
+        """Stop provisioning, wait for pending deletes and bulk-delete everything still pooled
+
+        Called before the worker's final flush, so the deletes travel in the final
+        batch that the master waits for at test stop.
+        """
+        if self._provisioner is not None:
+            self._provisioner.kill()
+            self._provisioner = None
+        self._provisioning.kill()
+        self._deletes.join()
+        if RESOURCE_CLEANUP and self._sets:
+            sets = list(self._sets.values())
+            logging.info(f"Deleting {len(sets)} pooled repository/policy/watch set(s)")
+            self._delete_all(sets)
+        self._sets.clear()
+        self.recorder.release(self.metrics)
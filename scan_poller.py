@@ -0,0 +1,145 @@
+import heapq
+import logging
+import random
+import time
+import gevent
+from gevent.event import AsyncResult, Event
+from gevent.pool import Pool
+from locust.clients import HttpSession
+import payloads
+from payloads import JSON_HEADERS
+from config import (
+    JFROG_URL, SCAN_POLL_INITIAL_DELAY, SCAN_POLL_MAX_DELAY, SCAN_POLL_TIMEOUT, SCAN_POLL_CONCURRENCY
+)
+
+SCAN_DONE_STATUSES = ("DONE", "SCANNED")
+SCAN_FAILED_STATUSES = ("FAILED", "NOT_SUPPORTED")
+
+
+class ScanStatusPoller:
+    """Worker-level poller that tracks pushed artifacts until Xray reports their scan complete
+
+    One scheduler greenlet owns a min-heap of due times and dispatches status checks
+    to a bounded pool, so user greenlets never sleep in polling loops. Each artifact
+    is polled with exponential backoff and jitter, and the first poll is scheduled
+    around the scan time observed so far (EWMA) so fast servers aren't over-polled.
+    A "scan_complete" sample records the time from push to scanned.
+    """
+
+    def __init__(self, environment, recorder):
+        self.client = HttpSession(
+            base_url=environment.host or JFROG_URL,
+            request_event=environment.events.request,
+            user=None
+        )
+        self.recorder = recorder
+        self.metrics = recorder.new_buffer()
+        self._artifacts = {}
+        self._due = []
+        self._wakeup = Event()
+        self._pool = Pool(SCAN_POLL_CONCURRENCY)
+        self._greenlet = None
+        self._expected_scan_seconds = None
+
+    def start(self):
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+        self._pool.kill()
+        if self._artifacts:
+            logging.info(f"Scan poller stopped with {len(self._artifacts)} artifact(s) still unscanned")
+        for artifact in self._artifacts.values():
+            artifact["result"].set(False)
+        self._artifacts.clear()
+        self._due = []
+        self.recorder.release(self.metrics)
+
+    def track(self, repo, path):
+        """Start tracking a pushed artifact; repeated pushes of the same artifact are coalesced
+
+        Returns an AsyncResult that is set to True once the scan completed.
+        """
+        key = (repo, path)
+        artifact = self._artifacts.get(key)
+        if artifact is None:
+            now = time.monotonic()
+            artifact = self._artifacts[key] = {"pushed_at": now, "attempt": 0, "result": AsyncResult()}
+            first_delay = SCAN_POLL_INITIAL_DELAY
+            if self._expected_scan_seconds is not None:
+                first_delay = max(first_delay, 0.8 * self._expected_scan_seconds)
+            self._schedule(key, now + first_delay)
+        return artifact["result"]
+
+    def _schedule(self, key, due):
+        heapq.heappush(self._due, (due, key))
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            while self._due and self._due[0][0] <= now:
+                _, key = heapq.heappop(self._due)
+                if key in self._artifacts:
+                    # Blocks while the pool is full, which throttles polling under load
+                    self._pool.spawn(self._check, key)
+            self._wakeup.clear()
+            self._wakeup.wait(max(0, self._due[0][0] - time.monotonic()) if self._due else None)
+
+    def _check(self, key):
+        artifact = self._artifacts.get(key)
+        if artifact is None:
+            return
+        repo, path = key
+        status = None
+        throttled = False
+        with self.client.post(
+            "/xray/api/v1/artifact/status",
+            data=payloads.ARTIFACT_STATUS.render(repo_key=repo, path=path),
+            headers=JSON_HEADERS,
+            name="/xray/api/v1/artifact/status [poll]",
+            catch_response=True
+        ) as response:
+            success = response.status_code in (200, 404)
+            if response.status_code == 200:
+                try:
+                    status = (response.json().get("overall") or {}).get("status")
+                    response.success()
+                except (ValueError, AttributeError) as e:
+                    # Not JSON or not the expected shape: a failed poll, retried with backoff below
+                    success = False
+                    response.failure(f"Unexpected scan status response: {e}")
+            elif response.status_code == 404:
+                # Not indexed yet: an expected state while the scan is queued
+                response.success()
+            else:
+                throttled = response.status_code in (429, 503)
+                response.failure(f"Scan status poll failed: {response.status_code}")
+            self.metrics.record("scan_status_poll", response.request_meta["response_time"], success)
+
+        elapsed = time.monotonic() - artifact["pushed_at"]
+        if status in SCAN_DONE_STATUSES:
+            self._complete(key, elapsed, True)
+        elif status in SCAN_FAILED_STATUSES:
+            logging.warning(f"Xray scan of {repo}/{path} ended with status {status}")
+            self._complete(key, elapsed, False)
+        elif elapsed > SCAN_POLL_TIMEOUT:
+            logging.warning(f"Gave up waiting for Xray scan of {repo}/{path} after {elapsed:.0f}s")
+            self._complete(key, elapsed, False)
+        else:
+            artifact["attempt"] += 1
+            # Back off harder when the server tells us it is overloaded
+            exponent = artifact["attempt"] + (2 if throttled else 0)
+            delay = min(SCAN_POLL_MAX_DELAY, SCAN_POLL_INITIAL_DELAY * 2 ** exponent)
+            self._schedule(key, time.monotonic() + delay * random.uniform(0.5, 1.5))
+
+    def _complete(self, key, elapsed, success):
+        artifact = self._artifacts.pop(key)
+        self.metrics.record("scan_complete", elapsed * 1000, success)
+        if success:
+            self._expected_scan_seconds = elapsed if self._expected_scan_seconds is None \
+                else 0.8 * self._expected_scan_seconds + 0.2 * elapsed
+        artifact["result"].set(success)